@@ -14,10 +14,28 @@ fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
 # for 'autogenerate' support
+from app import config as app_config
+from app import search
 from app.models import Base  # Импортируйте ваши модели
 
 target_metadata = Base.metadata
 
+# Колонки и индексы поиска создаются сырым DDL и в моделях не описаны
+UNMANAGED_OBJECTS = search.unmanaged_objects()
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Не даёт autogenerate удалить объекты полнотекстового поиска."""
+    if reflected and compare_to is None:
+        return name not in UNMANAGED_OBJECTS.get(type_, ())
+    return True
+
+
+# DSN берётся из окружения так же, как в приложении
+config.set_main_option(
+    "sqlalchemy.url", app_config.DATABASE_URL.replace("%", "%%")
+)
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -39,6 +57,7 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -54,7 +73,9 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
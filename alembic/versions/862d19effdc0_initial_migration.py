@@ -19,12 +19,81 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Схема в том виде, в каком её создавал Base.metadata.create_all.
+    # Базы, уже помеченные этой ревизией, её повторно не выполняют.
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_admin', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table(
+        'authors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('biography', sa.String(), nullable=True),
+        sa.Column('birth_date', sa.Date(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_authors_id', 'authors', ['id'])
+    op.create_index('ix_authors_name', 'authors', ['name'])
+
+    op.create_table(
+        'genres',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_genres_id', 'genres', ['id'])
+    op.create_index('ix_genres_name', 'genres', ['name'])
+
+    op.create_table(
+        'books',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('publication_date', sa.Date(), nullable=True),
+        sa.Column('available_copies', sa.Integer(), nullable=True),
+        sa.Column('author_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['author_id'], ['authors.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_books_id', 'books', ['id'])
+    op.create_index('ix_books_title', 'books', ['title'])
+
+    op.create_table(
+        'book_genres',
+        sa.Column('book_id', sa.Integer(), nullable=True),
+        sa.Column('genre_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id']),
+        sa.ForeignKeyConstraint(['genre_id'], ['genres.id']),
+    )
+
+    op.create_table(
+        'book_issues',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('book_id', sa.Integer(), nullable=True),
+        sa.Column('issue_date', sa.Date(), nullable=True),
+        sa.Column('return_date', sa.Date(), nullable=True),
+        sa.Column('expected_return_date', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_book_issues_id', 'book_issues', ['id'])
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table('book_issues')
+    op.drop_table('book_genres')
+    op.drop_table('books')
+    op.drop_table('genres')
+    op.drop_table('authors')
+    op.drop_table('users')
@@ -0,0 +1,50 @@
+"""Full-text search columns and indexes
+
+Revision ID: b7e41c2d9a03
+Revises: 862d19effdc0
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41c2d9a03'
+down_revision: Union[str, None] = '862d19effdc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблица, основное и дополнительное поле поиска (см. app/search.py)
+SEARCH_FIELDS = [
+    ('books', 'title', 'description'),
+    ('authors', 'name', 'biography'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, primary, secondary in SEARCH_FIELDS:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector "
+            f"tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('simple', coalesce({primary}, '')), 'A')"
+            f" || setweight(to_tsvector('simple', coalesce({secondary}, ''))"
+            f", 'B')) STORED"
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector "
+            f"ON {table} USING gin (search_vector)"
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{primary}_trgm "
+            f"ON {table} USING gin ({primary} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    for table, primary, _ in SEARCH_FIELDS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{primary}_trgm")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,98 @@
+"""Indexes, keys and constraints for hot queries
+
+Revision ID: c5d8f2a61e47
+Revises: b7e41c2d9a03
+Create Date: 2026-10-18 09:40:03.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8f2a61e47'
+down_revision: Union[str, None] = 'b7e41c2d9a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выдачи пользователя: фильтр по user_id и keyset-пагинация по id
+    op.create_index(
+        'ix_book_issues_user_id_id', 'book_issues', ['user_id', 'id']
+    )
+    op.create_index('ix_book_issues_book_id', 'book_issues', ['book_id'])
+    op.create_index('ix_books_author_id', 'books', ['author_id'])
+
+    # Перед созданием первичного ключа убираем дубли и пустые связи.
+    # Как и вся цепочка ревизий, только для PostgreSQL: ctid и имена
+    # внешних ключей по умолчанию (book_genres_*_fkey)
+    op.execute(
+        "DELETE FROM book_genres WHERE book_id IS NULL OR genre_id IS NULL"
+    )
+    op.execute(
+        "DELETE FROM book_genres a USING book_genres b "
+        "WHERE a.ctid > b.ctid "
+        "AND a.book_id = b.book_id AND a.genre_id = b.genre_id"
+    )
+    op.alter_column('book_genres', 'book_id', nullable=False)
+    op.alter_column('book_genres', 'genre_id', nullable=False)
+    op.create_primary_key(
+        'book_genres_pkey', 'book_genres', ['book_id', 'genre_id']
+    )
+    op.create_index('ix_book_genres_genre_id', 'book_genres', ['genre_id'])
+
+    # Связи удаляются вместе с книгой или жанром
+    op.drop_constraint(
+        'book_genres_book_id_fkey', 'book_genres', type_='foreignkey'
+    )
+    op.drop_constraint(
+        'book_genres_genre_id_fkey', 'book_genres', type_='foreignkey'
+    )
+    op.create_foreign_key(
+        'book_genres_book_id_fkey',
+        'book_genres',
+        'books',
+        ['book_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+    op.create_foreign_key(
+        'book_genres_genre_id_fkey',
+        'book_genres',
+        'genres',
+        ['genre_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'book_genres_genre_id_fkey', 'book_genres', type_='foreignkey'
+    )
+    op.drop_constraint(
+        'book_genres_book_id_fkey', 'book_genres', type_='foreignkey'
+    )
+    op.create_foreign_key(
+        'book_genres_book_id_fkey',
+        'book_genres',
+        'books',
+        ['book_id'],
+        ['id'],
+    )
+    op.create_foreign_key(
+        'book_genres_genre_id_fkey',
+        'book_genres',
+        'genres',
+        ['genre_id'],
+        ['id'],
+    )
+    op.drop_index('ix_book_genres_genre_id', table_name='book_genres')
+    op.drop_constraint('book_genres_pkey', 'book_genres', type_='primary')
+    op.alter_column('book_genres', 'genre_id', nullable=True)
+    op.alter_column('book_genres', 'book_id', nullable=True)
+    op.drop_index('ix_books_author_id', table_name='books')
+    op.drop_index('ix_book_issues_book_id', table_name='book_issues')
+    op.drop_index('ix_book_issues_user_id_id', table_name='book_issues')
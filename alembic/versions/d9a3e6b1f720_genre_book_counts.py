@@ -0,0 +1,50 @@
+"""Genre book counters
+
+Revision ID: d9a3e6b1f720
+Revises: c5d8f2a61e47
+Create Date: 2026-10-18 11:05:27.640381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3e6b1f720'
+down_revision: Union[str, None] = 'c5d8f2a61e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'genre_book_counts',
+        sa.Column('genre_id', sa.Integer(), nullable=False),
+        sa.Column('book_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['genre_id'], ['genres.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('genre_id'),
+    )
+    op.execute(
+        "INSERT INTO genre_book_counts (genre_id, book_count) "
+        "SELECT genres.id, count(book_genres.book_id) FROM genres "
+        "LEFT JOIN book_genres ON book_genres.genre_id = genres.id "
+        "GROUP BY genres.id"
+    )
+    op.create_index(
+        'ix_book_genres_genre_id_book_id',
+        'book_genres',
+        ['genre_id', 'book_id'],
+    )
+    op.drop_index('ix_book_genres_genre_id', table_name='book_genres')
+
+
+def downgrade() -> None:
+    op.create_index('ix_book_genres_genre_id', 'book_genres', ['genre_id'])
+    op.drop_index(
+        'ix_book_genres_genre_id_book_id', table_name='book_genres'
+    )
+    op.drop_table('genre_book_counts')
@@ -0,0 +1,79 @@
+"""Circulation statistics
+
+Revision ID: e4b7c0d2a915
+Revises: d9a3e6b1f720
+Create Date: 2026-10-18 12:40:11.208734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c0d2a915'
+down_revision: Union[str, None] = 'd9a3e6b1f720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_loan_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('open_loans', sa.Integer(), nullable=False),
+        sa.Column('total_loans', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.create_table(
+        'loan_due_counts',
+        sa.Column('due_date', sa.Date(), nullable=False),
+        sa.Column('open_loans', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('due_date'),
+    )
+    op.create_table(
+        'book_weekly_borrows',
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False),
+        sa.Column('borrow_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('week_start', 'book_id'),
+    )
+    op.create_index(
+        'ix_book_weekly_borrows_week_start_borrow_count',
+        'book_weekly_borrows',
+        ['week_start', 'borrow_count'],
+    )
+
+    # Заполнение сводок по уже существующей истории выдач
+    op.execute(
+        "INSERT INTO user_loan_stats (user_id, open_loans, total_loans) "
+        "SELECT user_id, "
+        "sum(CASE WHEN return_date IS NULL THEN 1 ELSE 0 END), count(*) "
+        "FROM book_issues WHERE user_id IS NOT NULL GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO loan_due_counts (due_date, open_loans) "
+        "SELECT expected_return_date, count(*) FROM book_issues "
+        "WHERE return_date IS NULL AND expected_return_date IS NOT NULL "
+        "GROUP BY expected_return_date"
+    )
+    week_start = "date_trunc('week', issue_date)::date"
+    op.execute(
+        "INSERT INTO book_weekly_borrows (week_start, book_id, borrow_count) "
+        f"SELECT {week_start}, book_id, count(*) FROM book_issues "
+        "WHERE issue_date IS NOT NULL AND book_id IS NOT NULL "
+        f"GROUP BY {week_start}, book_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_book_weekly_borrows_week_start_borrow_count',
+        table_name='book_weekly_borrows',
+    )
+    op.drop_table('book_weekly_borrows')
+    op.drop_table('loan_due_counts')
+    op.drop_table('user_loan_stats')
@@ -0,0 +1,40 @@
+"""Refresh tokens
+
+Revision ID: f2c9a8d4e617
+Revises: e4b7c0d2a915
+Create Date: 2026-10-18 16:05:42.517309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9a8d4e617'
+down_revision: Union[str, None] = 'e4b7c0d2a915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('family_id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('family_id'),
+    )
+    op.create_index(
+        op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_refresh_tokens_user_id'), table_name='refresh_tokens'
+    )
+    op.drop_table('refresh_tokens')
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app import config
+
+
+class TTLCache:
+    """Ограниченный по размеру LRU-кэш с временем жизни записей."""
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= self._timer():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, self._timer() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Аутентифицированные пользователи по subject токена. Кэш локален для
+# процесса, поэтому TTL ограничивает устаревание в других воркерах.
+principal_cache = TTLCache(
+    maxsize=config.PRINCIPAL_CACHE_SIZE, ttl=config.PRINCIPAL_CACHE_TTL
+)
+
+# Семейства refresh-токенов, отозванные этим процессом. Токены из них
+# отклоняются без обращения к базе; отзыв в других воркерах всё равно
+# виден, потому что строки семейства в таблице больше нет.
+revoked_refresh_families = TTLCache(
+    maxsize=config.REVOKED_REFRESH_CACHE_SIZE,
+    ttl=config.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+)
+
+
+class CacheBackend(ABC):
+    """Хранилище сериализованных ответов.
+
+    Методы асинхронные, чтобы общий для воркеров бэкенд (Redis,
+    memcached) можно было подключить через ``set_detail_cache_backend``
+    без изменения вызывающего кода.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        # Сетевым бэкендам стоит переопределить одним запросом (MGET)
+        return [await self.get(key) for key in keys]
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+
+detail_cache: CacheBackend = MemoryCacheBackend(
+    maxsize=config.DETAIL_CACHE_SIZE, ttl=config.DETAIL_CACHE_TTL
+)
+
+
+def set_detail_cache_backend(backend: CacheBackend):
+    global detail_cache
+    detail_cache = backend
+
+
+def book_key(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+def author_key(author_id: int) -> str:
+    return f"author:{author_id}"
+
+
+async def invalidate(key: str):
+    await detail_cache.delete(key)
+
+
+async def cached_batch(
+    ids: List[int],
+    key: Callable[[int], str],
+    load_many: Callable[[List[int]], Awaitable[Dict[int, bytes]]],
+) -> Tuple[bytes, List[int]]:
+    """Собирает JSON-массив карточек из кэша, догружая промахи разом.
+
+    ``load_many`` получает все отсутствующие в кэше id и возвращает
+    сериализованные карточки найденных записей. Возвращает тело ответа
+    (в порядке ``ids``) и список id, которых нет в базе.
+    """
+    bodies = await detail_cache.get_many([key(item_id) for item_id in ids])
+    misses = [item_id for item_id, body in zip(ids, bodies) if body is None]
+    loaded = await load_many(misses) if misses else {}
+    for item_id, body in loaded.items():
+        await detail_cache.set(key(item_id), body)
+
+    parts = []
+    missing = []
+    for item_id, body in zip(ids, bodies):
+        body = body if body is not None else loaded.get(item_id)
+        if body is None:
+            missing.append(item_id)
+        else:
+            parts.append(body)
+    return b"[" + b",".join(parts) + b"]", missing
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Для If-None-Match используется слабое сравнение
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+async def cached_response(
+    request: Request, key: str, load: Callable[[], Awaitable[bytes]]
+) -> Response:
+    """Отдаёт JSON из кэша, загружая его через ``load`` при промахе.
+
+    Ответ несёт сильный ETag; при совпадении If-None-Match тело не
+    передаётся (304).
+    """
+    body = await detail_cache.get(key)
+    if body is None:
+        body = await load()
+        await detail_cache.set(key, body)
+    return etag_response(request, body)
+
+
+def etag_response(request: Request, body: bytes) -> Response:
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
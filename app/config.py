@@ -0,0 +1,97 @@
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# База данных
+DEFAULT_DATABASE_URL = (
+    "postgresql+psycopg2://myuser:mypassword@db:5432/libradata"
+)
+DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+# Если не задан, строится из DATABASE_URL с драйвером asyncpg
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Пул соединений
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Таймауты (0 отключает statement_timeout)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+# Кэш аутентифицированных пользователей
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+
+# Refresh-токены: срок жизни семейства и размер фильтра отозванных
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REVOKED_REFRESH_CACHE_SIZE = int(
+    os.getenv("REVOKED_REFRESH_CACHE_SIZE", "10000")
+)
+
+# Хеширование паролей
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# "thread" или "process"
+PASSWORD_HASHER_EXECUTOR = os.getenv("PASSWORD_HASHER_EXECUTOR", "thread")
+PASSWORD_HASHER_WORKERS = int(os.getenv("PASSWORD_HASHER_WORKERS", "4"))
+# Сколько операций может ждать или выполняться, прежде чем отказывать
+PASSWORD_HASHER_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASHER_MAX_PENDING", "64")
+)
+
+# Кэш карточек книг и авторов
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", "10000"))
+DETAIL_CACHE_TTL = float(os.getenv("DETAIL_CACHE_TTL", "300"))
+
+# Сколько id можно запросить разом в GET /books/?ids=...
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+# Поток изменений доступности книг: "local" (один процесс) или
+# "postgres" (LISTEN/NOTIFY между воркерами)
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "local")
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", "1000"))
+
+# Массовый импорт
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_REPORTED_ERRORS = int(
+    os.getenv("IMPORT_MAX_REPORTED_ERRORS", "1000")
+)
+
+# Выгрузка
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+# Журнал: уровень, формат ("json" или "text") и размер очереди записей
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Доля записей INFO внутри запроса, которая попадает в журнал: общая и
+# по маршрутам, например "GET /books/{book_id}=0.01,POST /token=0.1"
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+# Диагностика SQL: журнал медленных запросов и поиск N+1
+DIAGNOSTICS_ENABLED = _env_bool("DIAGNOSTICS_ENABLED", False)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Сколько раз один SELECT может выполниться за запрос
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+# В тестах превышение порога — исключение, а не предупреждение
+N_PLUS_ONE_RAISE = _env_bool("N_PLUS_ONE_RAISE", False)
+
+# Запуск: ожидание БД с экспоненциальной задержкой между попытками
+DB_WAIT_TIMEOUT = float(os.getenv("DB_WAIT_TIMEOUT", "60"))
+DB_WAIT_INITIAL_DELAY = float(os.getenv("DB_WAIT_INITIAL_DELAY", "0.1"))
+DB_WAIT_MAX_DELAY = float(os.getenv("DB_WAIT_MAX_DELAY", "5"))
+# "auto" — create_all, только если схемой не управляет Alembic;
+# "always" или "never" — принудительно
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "auto")
+# Таймаут проверки соединения в /readyz
+DB_READY_TIMEOUT = float(os.getenv("DB_READY_TIMEOUT", "2"))
@@ -0,0 +1,110 @@
+"""Контекст текущего HTTP-запроса и время SQL-команд.
+
+``RequestContextMiddleware`` заводит на каждый запрос ``RequestContext``
+и кладёт его в contextvar. Метрики, диагностика SQL и журнал читают из
+него шаблон маршрута (``/books/{book_id}``, а не конкретный путь) и
+статистику SQL вместо собственных копий того же состояния.
+
+Слушатели движка ставятся один раз на класс ``Engine``: каждая команда
+замеряется, добавляется к счётчикам текущего запроса и передаётся
+обработчикам, зарегистрированным через ``on_statement``.
+"""
+
+import contextvars
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+UNMATCHED = "<unmatched>"
+
+
+class RequestContext:
+    __slots__ = ("scope", "statements", "db_seconds", "select_shapes")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        # Формы SELECT и число их выполнений для поиска N+1 (diagnostics)
+        self.select_shapes = {}
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+    @property
+    def route_template(self) -> str:
+        route = self.scope.get("route")
+        # До маршрутизации шаблона ещё нет; конкретный путь не идёт в
+        # метки и журнал, иначе их число не ограничено
+        return getattr(route, "path", None) or UNMATCHED
+
+    @property
+    def route(self) -> str:
+        return f"{self.method} {self.route_template}"
+
+
+_current = contextvars.ContextVar("request_context", default=None)
+
+
+def current() -> Optional[RequestContext]:
+    return _current.get()
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current.set(RequestContext(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+
+
+# (request, statement, parameters, executemany, elapsed) -> None
+StatementListener = Callable[
+    [Optional[RequestContext], str, object, bool, float], None
+]
+_statement_listeners: List[StatementListener] = []
+
+
+def on_statement(listener: StatementListener) -> StatementListener:
+    """Регистрирует обработчик каждой выполненной SQL-команды."""
+    _statement_listeners.append(listener)
+    return listener
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("statement_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    elapsed = time.perf_counter() - conn.info["statement_start"].pop()
+    request = _current.get()
+    if request is not None:
+        request.statements += 1
+        request.db_seconds += elapsed
+    for listener in _statement_listeners:
+        listener(request, statement, parameters, executemany, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute не вызывается для упавшей команды
+    if context.connection is not None:
+        starts = context.connection.info.get("statement_start")
+        if starts:
+            starts.pop()
@@ -1,207 +1,686 @@
-from fastapi import HTTPException
-from passlib.context import CryptContext
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
-
-from app import models, schemas
+import secrets
+from datetime import datetime
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+
+from app import cache, events, models, schemas, stats
+from app.cache import principal_cache, revoked_refresh_families
+from app.hashing import password_hasher
+from app.pagination import Page, make_page, paginate
+from app.responses import columns_for
+from app.search import apply_search
 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_user_by_username(db: Session, username: str):
-    user = (
-        db.query(models.User).filter(models.User.username == username).first()
+async def _get_rows_by_ids(db: AsyncSession, model, schema, ids):
+    """Строки с колонками ``schema`` для всех ``ids`` одним запросом."""
+    result = await db.execute(
+        select(*columns_for(model, schema)).filter(model.id.in_(ids))
+    )
+    return result.all()
+
+
+async def _insert_returning(db: AsyncSession, model, values: dict):
+    """INSERT ... RETURNING: созданный объект одной командой."""
+    return await db.scalar(insert(model).values(**values).returning(model))
+
+
+async def _update_returning(
+    db: AsyncSession, model, id: int, values: dict, *criteria
+):
+    """UPDATE ... RETURNING: изменённый объект или None, если строки нет.
+
+    Строка не читается заранее: проверка существования, изменение и
+    чтение результата — одна команда. ``criteria`` — дополнительные
+    условия WHERE; при их несовпадении тоже возвращается None.
+    """
+    return await db.scalar(
+        update(model)
+        .where(model.id == id, *criteria)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+
+
+async def _delete_by_id(db: AsyncSession, model, id: int) -> bool:
+    result = await db.execute(delete(model).where(model.id == id))
+    return result.rowcount > 0
+
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    user = await db.scalar(
+        select(models.User).filter(models.User.username == username)
     )
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = pwd_context.hash(user.password)
-    db_user = models.User(
-        username=user.username,
-        hashed_password=hashed_password,
-        is_admin=user.is_admin,
+async def get_users(db: AsyncSession):
+    result = await db.scalars(select(models.User).order_by(models.User.id))
+    return result.all()
+
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
+    hashed_password = await password_hasher.hash(user.password)
+    db_user = await _insert_returning(
+        db,
+        models.User,
+        {
+            "username": user.username,
+            "hashed_password": hashed_password,
+            "is_admin": user.is_admin,
+        },
+    )
+    await db.commit()
+    logger.info(
+        "User %s created",
+        db_user.username,
+        extra={"is_admin": db_user.is_admin},
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    logger.info(f"User {db_user.username} created")
     return db_user
 
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
     if not user:
         raise HTTPException(
             status_code=401, detail="Incorrect username or password"
         )
-    if not pwd_context.verify(password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(
+        password, user.hashed_password
+    )
+    if not verified:
         raise HTTPException(
             status_code=401, detail="Incorrect username or password"
         )
+    if new_hash:
+        # Стоимость bcrypt изменилась — пересчитываем хеш при входе
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 
-def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+async def update_user(
+    db: AsyncSession,
+    user_id: int,
+    user: schemas.UserUpdate,
+    previous_username: str = None,
+):
+    values = {}
+    if user.username:
+        values["username"] = user.username
+    if user.password:
+        values["hashed_password"] = await password_hasher.hash(user.password)
+    if values:
+        db_user = await _update_returning(db, models.User, user_id, values)
+    else:
+        db_user = await db.get(models.User, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    if user.username:
-        db_user.username = user.username
+    revoked = []
     if user.password:
-        db_user.hashed_password = pwd_context.hash(user.password)
-    db.commit()
-    db.refresh(db_user)
-    logger.info(f"User {db_user.username} updated")
+        # Смена пароля завершает все входы пользователя
+        revoked = await revoke_user_refresh_families(db, user_id)
+    await db.commit()
+    for family_id in revoked:
+        revoked_refresh_families.set(family_id, True)
+    # Закэшированный пользователь мог сменить имя или права
+    if previous_username:
+        principal_cache.pop(previous_username)
+    principal_cache.pop(db_user.username)
+    logger.info("User %s updated", db_user.username)
     return db_user
 
 
-def create_author(db: Session, author: schemas.AuthorCreate):
-    db_author = models.Author(**author.dict())
-    db.add(db_author)
-    db.commit()
-    db.refresh(db_author)
-    logger.info(f"Author {db_author.name} created")
-    return db_author
+async def create_refresh_family(
+    db: AsyncSession, user_id: int, expires_at: datetime
+) -> str:
+    family_id = secrets.token_urlsafe(24)
+    # Заодно убираем истёкшие входы этого пользователя
+    await db.execute(
+        delete(models.RefreshToken).where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.expires_at <= datetime.utcnow(),
+        )
+    )
+    await db.execute(
+        insert(models.RefreshToken).values(
+            family_id=family_id,
+            user_id=user_id,
+            generation=0,
+            expires_at=expires_at,
+        )
+    )
+    await db.commit()
+    return family_id
+
+
+async def rotate_refresh_family(
+    db: AsyncSession, family_id: str, generation: int, expires_at: datetime
+):
+    """Переводит семейство на следующее поколение.
+
+    Возвращает имя пользователя или None, если токен отозван, истёк,
+    уже был использован или пользователь отключён; кроме отзыва
+    семейство в этих случаях удаляется.
+    """
+    if revoked_refresh_families.get(family_id):
+        return None
+    token = models.RefreshToken
+    # Имя читается подзапросом в RETURNING: одна команда на обновление
+    username = (
+        select(models.User.username)
+        .where(models.User.id == token.user_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(token)
+        .where(
+            token.family_id == family_id,
+            token.generation == generation,
+            token.expires_at > datetime.utcnow(),
+            select(models.User.id)
+            .where(
+                models.User.id == token.user_id,
+                models.User.is_active.is_(True),
+            )
+            .exists(),
+        )
+        .values(generation=token.generation + 1, expires_at=expires_at)
+        .returning(username)
+    )
+    username = result.scalar()
+    if username is None:
+        await revoke_refresh_family(db, family_id)
+        return None
+    await db.commit()
+    return username
+
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        delete(models.RefreshToken).where(
+            models.RefreshToken.family_id == family_id
+        )
+    )
+    await db.commit()
+    revoked_refresh_families.set(family_id, True)
 
 
-def get_author(db: Session, author_id: int):
-    author = (
-        db.query(models.Author).filter(models.Author.id == author_id).first()
+async def revoke_user_refresh_families(db: AsyncSession, user_id: int):
+    """Удаляет все семейства пользователя; commit выполняет вызывающий."""
+    result = await db.execute(
+        delete(models.RefreshToken)
+        .where(models.RefreshToken.user_id == user_id)
+        .returning(models.RefreshToken.family_id)
     )
+    return result.scalars().all()
+
+
+async def create_author(db: AsyncSession, author: schemas.AuthorCreate):
+    db_author = await _insert_returning(db, models.Author, author.dict())
+    await db.commit()
+    logger.info("Author %s created", db_author.name)
+    return db_author
+
+
+async def get_author(db: AsyncSession, author_id: int, fields=()):
+    options = []
+    if fields:
+        columns = columns_for(models.Author, schemas.AuthorResponse, fields)
+        options.append(load_only(*columns))
+    author = await db.get(models.Author, author_id, options=options)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found")
     return author
 
 
-def update_author(db: Session, author_id: int, author: schemas.AuthorUpdate):
-    db_author = (
-        db.query(models.Author).filter(models.Author.id == author_id).first()
+async def update_author(
+    db: AsyncSession, author_id: int, author: schemas.AuthorUpdate
+):
+    db_author = await _update_returning(
+        db, models.Author, author_id, author.dict()
     )
     if not db_author:
         raise HTTPException(status_code=404, detail="Author not found")
-    for key, value in author.dict().items():
-        setattr(db_author, key, value)
-    db.commit()
-    db.refresh(db_author)
-    logger.info(f"Author {db_author.name} updated")
+    await db.commit()
+    await cache.invalidate(cache.author_key(author_id))
+    logger.info("Author %s updated", db_author.name)
     return db_author
 
 
-def delete_author(db: Session, author_id: int):
-    db_author = (
-        db.query(models.Author).filter(models.Author.id == author_id).first()
-    )
-    if not db_author:
+async def delete_author(db: AsyncSession, author_id: int):
+    if not await _delete_by_id(db, models.Author, author_id):
         raise HTTPException(status_code=404, detail="Author not found")
-    db.delete(db_author)
-    db.commit()
-    logger.info(f"Author with ID {author_id} deleted")
+    await db.commit()
+    await cache.invalidate(cache.author_key(author_id))
+    logger.info("Author with ID %s deleted", author_id)
     return {"detail": "Author deleted"}
 
 
-def get_authors(
-    db: Session, skip: int = 0, limit: int = 10, search: str = None
+async def get_authors(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    search: str = None,
+    cursor: str = None,
+    fields=(),
 ):
-    query = db.query(models.Author)
+    # Только колонки ответа: строки сериализуются без ORM и Pydantic
+    query = select(*columns_for(models.Author, schemas.AuthorResponse, fields))
     if search:
-        query = query.filter(
-            or_(
-                models.Author.name.ilike(f"%{search}%"),
-                models.Author.biography.ilike(f"%{search}%"),
+        # Результаты поиска упорядочены по релевантности, а не по id
+        if cursor is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not supported with search",
             )
+        query = apply_search(
+            query, models.Author, search, db.get_bind().dialect.name
         )
-    return query.offset(skip).limit(limit).all()
+        result = await db.execute(query.offset(skip).limit(limit))
+        return Page(result.all(), None)
+    result = await db.execute(
+        paginate(query, models.Author, skip, limit, cursor)
+    )
+    return make_page(result.all(), limit)
 
 
-def create_book(db: Session, book: schemas.BookCreate):
-    db_book = models.Book(**book.dict())
-    db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
-    logger.info(f"Book {db_book.title} created")
+async def get_authors_by_ids(db: AsyncSession, ids):
+    return await _get_rows_by_ids(
+        db, models.Author, schemas.AuthorResponse, ids
+    )
+
+
+async def create_book(db: AsyncSession, book: schemas.BookCreate):
+    db_book = await _insert_returning(db, models.Book, book.dict())
+    await db.commit()
+    logger.info("Book %s created", db_book.title)
     return db_book
 
 
-def get_book(db: Session, book_id: int):
-    book = db.query(models.Book).filter(models.Book.id == book_id).first()
+async def get_books_by_ids(db: AsyncSession, ids):
+    return await _get_rows_by_ids(db, models.Book, schemas.BookResponse, ids)
+
+
+async def get_availability(db: AsyncSession, ids) -> dict:
+    result = await db.execute(
+        select(models.Book.id, models.Book.available_copies).filter(
+            models.Book.id.in_(ids)
+        )
+    )
+    return dict(result.all())
+
+
+def _book_load_options(include, fields=()):
+    # selectinload — один дополнительный запрос на связь для всей страницы
+    options = [selectinload(getattr(models.Book, name)) for name in include]
+    if fields:
+        options.append(
+            load_only(*columns_for(models.Book, schemas.BookResponse, fields))
+        )
+    return options
+
+
+async def get_book(
+    db: AsyncSession, book_id: int, include=frozenset(), fields=()
+):
+    book = await db.get(
+        models.Book, book_id, options=_book_load_options(include, fields)
+    )
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
 
-def update_book(db: Session, book_id: int, book: schemas.BookUpdate):
-    db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
+async def update_book(
+    db: AsyncSession, book_id: int, book: schemas.BookUpdate
+):
+    values = book.dict()
+    # Обычная правка не меняет available_copies: она обходится одной
+    # командой и не рассылает подписчикам событие без изменений
+    db_book = await _update_returning(
+        db,
+        models.Book,
+        book_id,
+        values,
+        models.Book.available_copies == book.available_copies,
+    )
     if not db_book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    for key, value in book.dict().items():
-        setattr(db_book, key, value)
-    db.commit()
-    db.refresh(db_book)
-    logger.info(f"Book {db_book.title} updated")
+        db_book = await _update_returning(db, models.Book, book_id, values)
+        if not db_book:
+            raise HTTPException(status_code=404, detail="Book not found")
+        await events.publish_availability(
+            db, book_id, db_book.available_copies
+        )
+    await db.commit()
+    events.after_commit(db)
+    await cache.invalidate(cache.book_key(book_id))
+    logger.info("Book %s updated", db_book.title)
     return db_book
 
 
-def delete_book(db: Session, book_id: int):
-    db_book = db.query(models.Book).filter(models.Book.id == book_id).first()
-    if not db_book:
+async def delete_book(db: AsyncSession, book_id: int):
+    # Для несуществующей книги первые две команды ничего не меняют
+    book_genre_ids = select(models.book_genres.c.genre_id).filter(
+        models.book_genres.c.book_id == book_id
+    )
+    await db.execute(
+        update(models.GenreBookCount)
+        .filter(models.GenreBookCount.genre_id.in_(book_genre_ids))
+        .values(book_count=models.GenreBookCount.book_count - 1)
+    )
+    await db.execute(
+        delete(models.book_genres).filter(
+            models.book_genres.c.book_id == book_id
+        )
+    )
+    if not await _delete_by_id(db, models.Book, book_id):
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Book not found")
-    db.delete(db_book)
-    db.commit()
-    logger.info(f"Book with ID {book_id} deleted")
+    await db.commit()
+    await cache.invalidate(cache.book_key(book_id))
+    logger.info("Book with ID %s deleted", book_id)
     return {"detail": "Book deleted"}
 
 
-def get_books(db: Session, skip: int = 0, limit: int = 10, search: str = None):
-    query = db.query(models.Book)
+def _rows(result, include):
+    return result.scalars().all() if include else result.all()
+
+
+async def get_books(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    search: str = None,
+    cursor: str = None,
+    include=frozenset(),
+    genre: int = None,
+    fields=(),
+):
+    """Страница книг.
+
+    Без ``include`` выбираются только колонки ``BookResponse`` (или
+    ``fields``) и возвращаются строки; со связями — ORM-объекты с
+    загруженными связями.
+    """
+    if include:
+        query = select(models.Book).options(
+            *_book_load_options(include, fields)
+        )
+    else:
+        query = select(*columns_for(models.Book, schemas.BookResponse, fields))
+    if genre is not None:
+        query = query.join(
+            models.book_genres, models.book_genres.c.book_id == models.Book.id
+        ).filter(models.book_genres.c.genre_id == genre)
     if search:
-        query = query.filter(
-            or_(
-                models.Book.title.ilike(f"%{search}%"),
-                models.Book.description.ilike(f"%{search}%"),
+        # Результаты поиска упорядочены по релевантности, а не по id
+        if cursor is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is not supported with search",
             )
+        query = apply_search(
+            query, models.Book, search, db.get_bind().dialect.name
+        )
+        result = await db.execute(query.offset(skip).limit(limit))
+        return Page(_rows(result, include), None)
+    result = await db.execute(
+        paginate(query, models.Book, skip, limit, cursor)
+    )
+    return make_page(_rows(result, include), limit)
+
+
+async def create_genre(db: AsyncSession, genre: schemas.GenreCreate):
+    db_genre = await _insert_returning(db, models.Genre, genre.dict())
+    await db.execute(
+        insert(models.GenreBookCount).values(
+            genre_id=db_genre.id, book_count=0
         )
-    return query.offset(skip).limit(limit).all()
+    )
+    await db.commit()
+    logger.info("Genre %s created", db_genre.name)
+    return db_genre
 
 
-def create_book_issue(db: Session, book_issue: schemas.BookIssueCreate):
-    db_book_issue = models.BookIssue(**book_issue.dict())
-    db.add(db_book_issue)
-    db.commit()
-    db.refresh(db_book_issue)
+async def get_genre(db: AsyncSession, genre_id: int):
+    genre = await db.get(models.Genre, genre_id)
+    if not genre:
+        raise HTTPException(status_code=404, detail="Genre not found")
+    return genre
+
+
+async def get_genres(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None
+):
+    result = await db.scalars(
+        paginate(select(models.Genre), models.Genre, skip, limit, cursor)
+    )
+    return make_page(result.all(), limit)
+
+
+async def update_genre(
+    db: AsyncSession, genre_id: int, genre: schemas.GenreUpdate
+):
+    db_genre = await _update_returning(
+        db, models.Genre, genre_id, genre.dict()
+    )
+    if not db_genre:
+        raise HTTPException(status_code=404, detail="Genre not found")
+    await db.commit()
+    logger.info("Genre %s updated", db_genre.name)
+    return db_genre
+
+
+async def delete_genre(db: AsyncSession, genre_id: int):
+    await db.execute(
+        delete(models.book_genres).filter(
+            models.book_genres.c.genre_id == genre_id
+        )
+    )
+    await db.execute(
+        delete(models.GenreBookCount).filter(
+            models.GenreBookCount.genre_id == genre_id
+        )
+    )
+    if not await _delete_by_id(db, models.Genre, genre_id):
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Genre not found")
+    await db.commit()
+    logger.info("Genre with ID %s deleted", genre_id)
+    return {"detail": "Genre deleted"}
+
+
+async def _change_genre_count(db: AsyncSession, genre_id: int, delta: int):
+    await db.execute(
+        update(models.GenreBookCount)
+        .filter(models.GenreBookCount.genre_id == genre_id)
+        .values(book_count=models.GenreBookCount.book_count + delta)
+    )
+
+
+async def add_book_genre(db: AsyncSession, book_id: int, genre_id: int):
+    await get_book(db, book_id)
+    await get_genre(db, genre_id)
+    try:
+        await db.execute(
+            insert(models.book_genres).values(
+                book_id=book_id, genre_id=genre_id
+            )
+        )
+    except IntegrityError:
+        # Связь уже есть — счётчик не меняется
+        await db.rollback()
+        return {"detail": "Genre added to book"}
+    await _change_genre_count(db, genre_id, 1)
+    await db.commit()
+    logger.info("Genre with ID %s added to book with ID %s", genre_id, book_id)
+    return {"detail": "Genre added to book"}
+
+
+async def remove_book_genre(db: AsyncSession, book_id: int, genre_id: int):
+    result = await db.execute(
+        delete(models.book_genres).filter(
+            models.book_genres.c.book_id == book_id,
+            models.book_genres.c.genre_id == genre_id,
+        )
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Book genre not found")
+    await _change_genre_count(db, genre_id, -1)
+    await db.commit()
+    logger.info(
+        "Genre with ID %s removed from book with ID %s", genre_id, book_id
+    )
+    return {"detail": "Genre removed from book"}
+
+
+async def get_genre_facets(db: AsyncSession, search: str = None):
+    """Число книг в каждом жанре.
+
+    Без поиска счётчики читаются из genre_book_counts; с поиском
+    считаются только по книгам, найденным полнотекстовым индексом.
+    """
+    if not search:
+        result = await db.execute(
+            select(
+                models.Genre.id,
+                models.Genre.name,
+                models.GenreBookCount.book_count,
+            )
+            .join(
+                models.GenreBookCount,
+                models.GenreBookCount.genre_id == models.Genre.id,
+            )
+            .order_by(models.Genre.id)
+        )
+        return result.mappings().all()
+    matched = apply_search(
+        select(models.Book.id), models.Book, search, db.get_bind().dialect.name
+    ).order_by(None)
+    book_count = func.count(models.book_genres.c.book_id)
+    result = await db.execute(
+        select(
+            models.Genre.id, models.Genre.name, book_count.label("book_count")
+        )
+        .join(
+            models.book_genres,
+            models.book_genres.c.genre_id == models.Genre.id,
+        )
+        .filter(models.book_genres.c.book_id.in_(matched))
+        .group_by(models.Genre.id, models.Genre.name)
+        .order_by(models.Genre.id)
+    )
+    return result.mappings().all()
+
+
+async def create_book_issue(
+    db: AsyncSession, book_issue: schemas.BookIssueCreate
+):
+    # Условный UPDATE атомарно проверяет и уменьшает остаток без
+    # чтения-изменения-записи; блокировка строки держится до commit ниже
+    available_copies = await db.scalar(
+        update(models.Book)
+        .where(
+            models.Book.id == book_issue.book_id,
+            models.Book.available_copies > 0,
+        )
+        .values(available_copies=models.Book.available_copies - 1)
+        .returning(models.Book.available_copies)
+    )
+    if available_copies is None:
+        await db.rollback()
+        if not await db.get(models.Book, book_issue.book_id):
+            raise HTTPException(status_code=404, detail="Book not found")
+        raise HTTPException(status_code=409, detail="No copies available")
+    db_book_issue = await _insert_returning(
+        db, models.BookIssue, book_issue.dict()
+    )
+    await stats.record_checkout(db, db_book_issue)
+    await events.publish_availability(db, book_issue.book_id, available_copies)
+    await db.commit()
+    events.after_commit(db)
+    await cache.invalidate(cache.book_key(book_issue.book_id))
     logger.info(
-        f"Book with ID {db_book_issue.book_id} issued to user with ID {db_book_issue.user_id}"
+        "Book with ID %s issued to user with ID %s",
+        db_book_issue.book_id,
+        db_book_issue.user_id,
     )
     return db_book_issue
 
 
-def update_book_issue(
-    db: Session, book_issue_id: int, book_issue: schemas.BookIssueUpdate
+async def update_book_issue(
+    db: AsyncSession, book_issue_id: int, book_issue: schemas.BookIssueUpdate
 ):
-    db_book_issue = (
-        db.query(models.BookIssue)
-        .filter(models.BookIssue.id == book_issue_id)
-        .first()
-    )
-    if not db_book_issue:
-        raise HTTPException(status_code=404, detail="Book issue not found")
-    if book_issue.return_date:
-        db_book_issue.return_date = book_issue.return_date
-    db.commit()
-    db.refresh(db_book_issue)
-    logger.info(f"Book issue with ID {book_issue_id} updated")
+    if not book_issue.return_date:
+        db_book_issue = await db.get(models.BookIssue, book_issue_id)
+        if not db_book_issue:
+            raise HTTPException(status_code=404, detail="Book issue not found")
+        return db_book_issue
+    # Экземпляр возвращается на полку только при первом возврате
+    db_book_issue = await db.scalar(
+        update(models.BookIssue)
+        .where(
+            models.BookIssue.id == book_issue_id,
+            models.BookIssue.return_date.is_(None),
+        )
+        .values(return_date=book_issue.return_date)
+        .returning(models.BookIssue)
+        .execution_options(populate_existing=True)
+    )
+    returned = db_book_issue is not None
+    if returned:
+        available_copies = await db.scalar(
+            update(models.Book)
+            .where(models.Book.id == db_book_issue.book_id)
+            .values(available_copies=models.Book.available_copies + 1)
+            .returning(models.Book.available_copies)
+        )
+        await stats.record_return(
+            db, db_book_issue.user_id, db_book_issue.expected_return_date
+        )
+        await events.publish_availability(
+            db, db_book_issue.book_id, available_copies
+        )
+    else:
+        # Повторный возврат только исправляет дату
+        db_book_issue = await _update_returning(
+            db,
+            models.BookIssue,
+            book_issue_id,
+            {"return_date": book_issue.return_date},
+        )
+        if not db_book_issue:
+            raise HTTPException(status_code=404, detail="Book issue not found")
+    await db.commit()
+    events.after_commit(db)
+    if returned:
+        await cache.invalidate(cache.book_key(db_book_issue.book_id))
+    logger.info("Book issue with ID %s updated", book_issue_id)
     return db_book_issue
 
 
-def get_book_issues(db: Session, user_id: int):
-    return (
-        db.query(models.BookIssue)
-        .filter(models.BookIssue.user_id == user_id)
-        .all()
+async def get_book_issues(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str = None,
+):
+    query = select(
+        *columns_for(models.BookIssue, schemas.BookIssueResponse)
+    ).filter(models.BookIssue.user_id == user_id)
+    result = await db.execute(
+        paginate(query, models.BookIssue, skip, limit, cursor)
     )
+    return make_page(result.all(), limit)
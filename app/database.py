@@ -1,16 +1,197 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import time
+
+from sqlalchemy import create_engine, exc, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app import config, metrics
+
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = config.ASYNC_DATABASE_URL or (
+    make_url(SQLALCHEMY_DATABASE_URL)
+    .set(drivername="postgresql+asyncpg")
+    .render_as_string(hide_password=False)
+)
+
+
+class PoolStats:
+    """Счётчики ожидания соединения из пула."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, elapsed: float):
+        self.checkouts += 1
+        self.wait_seconds_total += elapsed
+        self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+        metrics.DB_POOL_WAIT.observe(elapsed)
+
 
-SQLALCHEMY_DATABASE_URL = "postgresql://myuser:mypassword@db:5432/libradata"
+pool_stats = PoolStats()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время выдачи соединения (ожидание + pre_ping)."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            metrics.DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - start)
+
+
+def _engine_options(url: str, is_async: bool) -> dict:
+    options = {
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() != "postgresql":
+        return options
+    options.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    timeout_ms = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if is_async:
+        options["poolclass"] = TimedAsyncQueuePool
+        options["connect_args"] = {
+            "timeout": config.DB_CONNECT_TIMEOUT,
+            "server_settings": {"statement_timeout": timeout_ms},
+        }
+    else:
+        options["connect_args"] = {
+            "connect_timeout": config.DB_CONNECT_TIMEOUT,
+            "options": f"-c statement_timeout={timeout_ms}",
+        }
+    return options
+
+
+# Синхронный движок остаётся для Alembic и служебных скриптов
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    **_engine_options(SQLALCHEMY_DATABASE_URL, is_async=False),
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Асинхронный движок используется обработчиками запросов;
+# AsyncSessionLocal — единственная фабрика сессий для приложения
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    **_engine_options(ASYNC_SQLALCHEMY_DATABASE_URL, is_async=True),
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+
+def get_pool_status() -> dict:
+    pool = async_engine.pool
+    status = {
+        "checkouts": pool_stats.checkouts,
+        "timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=config.DB_MAX_OVERFLOW,
+        )
+    return status
+
+
+# Ошибки, после которых имеет смысл повторить подключение
+_CONNECT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    exc.DBAPIError,
+    exc.TimeoutError,
+)
+
+
+async def _ping():
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+async def wait_for_database() -> int:
+    """Ждёт, пока БД начнёт принимать соединения; возвращает число попыток.
+
+    Задержка между попытками удваивается от ``DB_WAIT_INITIAL_DELAY`` до
+    ``DB_WAIT_MAX_DELAY``; через ``DB_WAIT_TIMEOUT`` секунд ошибка
+    последней попытки пробрасывается.
+    """
+    deadline = time.monotonic() + config.DB_WAIT_TIMEOUT
+    delay = config.DB_WAIT_INITIAL_DELAY
+    attempt = 1
+    while True:
+        try:
+            await _ping()
+            return attempt
+        except _CONNECT_ERRORS as error:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            logger.warning(
+                "Database is not ready (attempt %d): %s", attempt, error
+            )
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, config.DB_WAIT_MAX_DELAY)
+            attempt += 1
+
+
+async def check_database() -> bool:
     try:
+        await asyncio.wait_for(_ping(), config.DB_READY_TIMEOUT)
+    except _CONNECT_ERRORS:
+        return False
+    return True
+
+
+async def init_schema() -> bool:
+    """Создаёт таблицы, если схемой не управляет Alembic.
+
+    Возвращает True, если ``create_all`` выполнялся.
+    """
+    if config.DB_CREATE_ALL == "never":
+        return False
+    async with async_engine.begin() as connection:
+        if config.DB_CREATE_ALL == "auto":
+            managed = await connection.run_sync(
+                lambda sync_connection: inspect(sync_connection).has_table(
+                    "alembic_version"
+                )
+            )
+            if managed:
+                return False
+        await connection.run_sync(Base.metadata.create_all)
+    return True
+
+
+async def close_database():
+    await async_engine.dispose()
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,81 @@
+"""Диагностика SQL: журнал медленных запросов и поиск N+1.
+
+Время каждой SQL-команды приходит из ``app.context`` (``on_statement``).
+В контексте HTTP-запроса считаются «формы» SELECT: текст команды с
+плейсхолдерами, в котором списки ``IN (?, ?, ...)`` свёрнуты. Если одна
+форма выполняется больше ``N_PLUS_ONE_THRESHOLD`` раз, это почти всегда
+загрузка связанных объектов в цикле. Такой запрос пишется в журнал, а с
+``N_PLUS_ONE_RAISE`` (так настроены тесты) прерывается исключением.
+Повторяющиеся INSERT не считаются: построчный импорт делает их
+намеренно.
+"""
+
+import logging
+import re
+
+from app import config, context
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)"
+_IN_LIST_RE = re.compile(
+    rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)"
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    return _IN_LIST_RE.sub("(...)", shape)
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """Типы параметров без значений: в журнал не попадают данные."""
+    if executemany:
+        rows = list(parameters or ())
+        first = parameter_shape(rows[0]) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        items = ", ".join(
+            f"{name}: {type(value).__name__}"
+            for name, value in parameters.items()
+        )
+        return "{" + items + "}"
+    if parameters is None:
+        return "()"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+@context.on_statement
+def _check_statement(request, statement, parameters, executemany, elapsed):
+    if not config.DIAGNOSTICS_ENABLED:
+        return
+    elapsed_ms = elapsed * 1000
+    route = request.route if request else "-"
+
+    if elapsed_ms >= config.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query %.1fms on %s: %s params=%s",
+            elapsed_ms,
+            route,
+            statement_shape(statement),
+            parameter_shape(parameters, executemany),
+        )
+
+    if request is None or not statement.lstrip().upper().startswith("SELECT"):
+        return
+    shape = statement_shape(statement)
+    count = request.select_shapes.get(shape, 0) + 1
+    request.select_shapes[shape] = count
+    if count == config.N_PLUS_ONE_THRESHOLD + 1:
+        message = (
+            f"Possible N+1 on {route}: statement executed more than "
+            f"{config.N_PLUS_ONE_THRESHOLD} times: {shape}"
+        )
+        if config.N_PLUS_ONE_RAISE:
+            raise NPlusOneError(message)
+        logger.warning(message)
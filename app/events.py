@@ -0,0 +1,323 @@
+"""Рассылка изменений доступности книг подписчикам SSE.
+
+Выдача, возврат и ``crud.update_book`` публикуют новое
+``available_copies`` книги в транзакции изменения, а после commit
+вызывают ``after_commit``. Бэкенд доставляет событие во все процессы:
+``local`` — только в текущий и после commit, ``postgres`` — через
+``pg_notify`` в той же транзакции, чтобы подписчик получил изменение,
+сделанное другим воркером. В процессе ``broker`` передаёт событие
+подпискам на эту книгу.
+
+Подписка хранит только последнее значение по каждой книге, поэтому
+медленный клиент не накапливает очередь: пока он не прочитал события,
+новые изменения одной книги заменяют старые.
+"""
+
+import asyncio
+import contextlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "book_availability"
+
+# События транзакции, ожидающие commit, в ``AsyncSession.info``
+_PENDING = "pending_availability"
+
+
+class Subscription:
+    def __init__(self, book_ids: Iterable[int]):
+        self.book_ids = frozenset(book_ids)
+        self.loop = asyncio.get_running_loop()
+        self._pending: Dict[int, int] = {}
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def offer(self, book_id: int, available_copies: int):
+        """Вызывается в цикле событий подписчика."""
+        self._pending[book_id] = available_copies
+        self._ready.set()
+
+    def close(self):
+        """Вызывается в цикле событий подписчика."""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Dict[int, int]]:
+        """Ждёт изменений и забирает все накопленные разом.
+
+        После ``close`` возвращает None.
+        """
+        await self._ready.wait()
+        self._ready.clear()
+        if self.closed:
+            return None
+        pending, self._pending = self._pending, {}
+        return pending
+
+
+class Broker:
+    def __init__(self, max_subscribers: int):
+        self.max_subscribers = max_subscribers
+        self._subscriptions = set()
+        self._by_book: Dict[int, set] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, book_ids: Iterable[int]) -> Subscription:
+        subscription = Subscription(book_ids)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscribers:
+                raise HTTPException(
+                    status_code=503, detail="Too many subscribers"
+                )
+            self._subscriptions.add(subscription)
+            for book_id in subscription.book_ids:
+                self._by_book.setdefault(book_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.discard(subscription)
+            for book_id in subscription.book_ids:
+                subscribers = self._by_book.get(book_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_book[book_id]
+
+    def deliver(self, book_id: int, available_copies: int):
+        with self._lock:
+            subscribers = list(self._by_book.get(book_id, ()))
+        self._dispatch(subscribers, "offer", book_id, available_copies)
+
+    def close_all(self):
+        """Закрывает все потоки: клиенты переподключатся за снимком."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+            self._by_book.clear()
+        self._dispatch(subscriptions, "close")
+
+    @staticmethod
+    def _dispatch(subscriptions, method: str, *args):
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for subscription in subscriptions:
+            callback = getattr(subscription, method)
+            # asyncio.Event не потокобезопасен: чужой цикл будим через
+            # call_soon_threadsafe
+            if subscription.loop is current:
+                callback(*args)
+            elif not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(callback, *args)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+
+broker = Broker(max_subscribers=config.EVENTS_MAX_SUBSCRIBERS)
+
+
+class EventBackend(ABC):
+    """Доставка событий между процессами."""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(
+        self, db: AsyncSession, book_id: int, available_copies: int
+    ) -> None:
+        """Вызывается в транзакции изменения до commit."""
+
+    def after_commit(self, db: AsyncSession) -> None:
+        pass
+
+
+class LocalEventBackend(EventBackend):
+    async def publish(
+        self, db: AsyncSession, book_id: int, available_copies: int
+    ) -> None:
+        # До commit изменение не зафиксировано: доставка после него
+        db.info.setdefault(_PENDING, {})[book_id] = available_copies
+
+    def after_commit(self, db: AsyncSession) -> None:
+        for book_id, available_copies in db.info.pop(_PENDING, {}).items():
+            broker.deliver(book_id, available_copies)
+
+
+class PostgresEventBackend(EventBackend):
+    """NOTIFY в транзакции изменения, LISTEN на отдельном соединении.
+
+    PostgreSQL доставляет уведомление только после commit транзакции,
+    при откате его нет. Уведомление получают все процессы, включая
+    отправителя, поэтому в ``broker`` событие попадает только через него.
+
+    Если соединение LISTEN оборвалось, открытые потоки закрываются:
+    изменения за время разрыва не придут, и клиенту нужен новый снимок.
+    Соединение восстанавливается с задержкой, удваивающейся от
+    ``DB_WAIT_INITIAL_DELAY`` до ``DB_WAIT_MAX_DELAY``.
+    """
+
+    def __init__(self, url: str):
+        url = make_url(url)
+        self.dsn = url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self._connection = None
+        self._reconnect_task = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reconnect_task
+            self._reconnect_task = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _connect(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        try:
+            await connection.add_listener(CHANNEL, self._on_notify)
+        except BaseException:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._on_terminate)
+        self._connection = connection
+
+    def _on_notify(self, connection, pid, channel, payload):
+        event = orjson.loads(payload)
+        broker.deliver(event["book_id"], event["available_copies"])
+
+    def _on_terminate(self, connection):
+        if self._stopping or connection is not self._connection:
+            return
+        self._connection = None
+        logger.warning("Availability listener disconnected, reconnecting")
+        broker.close_all()
+        self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = config.DB_WAIT_INITIAL_DELAY
+        attempt = 1
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception as error:
+                logger.warning(
+                    "Availability listener reconnect failed (attempt %d): %s",
+                    attempt,
+                    error,
+                )
+                delay = min(delay * 2, config.DB_WAIT_MAX_DELAY)
+                attempt += 1
+                continue
+            # Потоки, открытые во время разрыва, тоже пропустили изменения
+            broker.close_all()
+            logger.info("Availability listener reconnected")
+            return
+
+    async def publish(
+        self, db: AsyncSession, book_id: int, available_copies: int
+    ) -> None:
+        payload = orjson.dumps(
+            {"book_id": book_id, "available_copies": available_copies}
+        ).decode()
+        await db.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+event_backend: EventBackend = LocalEventBackend()
+
+
+def set_event_backend(backend: EventBackend):
+    global event_backend
+    event_backend = backend
+
+
+async def start():
+    if config.EVENTS_BACKEND == "postgres":
+        from app.database import ASYNC_SQLALCHEMY_DATABASE_URL
+
+        set_event_backend(PostgresEventBackend(ASYNC_SQLALCHEMY_DATABASE_URL))
+    await event_backend.start()
+
+
+async def stop():
+    await event_backend.stop()
+
+
+async def publish_availability(
+    db: AsyncSession, book_id: int, available_copies: int
+):
+    """Публикует изменение в текущей транзакции ``db``, до commit."""
+    await event_backend.publish(db, book_id, available_copies)
+
+
+def after_commit(db: AsyncSession):
+    """Доставляет события, которые бэкенд отложил до commit."""
+    event_backend.after_commit(db)
+
+
+def _format_event(book_id: int, available_copies: int) -> bytes:
+    data = orjson.dumps(
+        {"book_id": book_id, "available_copies": available_copies}
+    )
+    return b"event: availability\ndata: " + data + b"\n\n"
+
+
+async def stream(subscription: Subscription, snapshot: Dict[int, int]):
+    """Тело ответа text/event-stream.
+
+    Сначала текущие значения, затем изменения. Без изменений раз в
+    ``EVENTS_HEARTBEAT_SECONDS`` отправляется комментарий, чтобы прокси
+    не закрывали соединение.
+    """
+    try:
+        for book_id, available_copies in snapshot.items():
+            yield _format_event(book_id, available_copies)
+        while True:
+            try:
+                changes = await asyncio.wait_for(
+                    subscription.get(), config.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if changes is None:
+                # Поток закрыт бэкендом; клиент переподключится за снимком
+                return
+            yield b"".join(
+                _format_event(book_id, available_copies)
+                for book_id, available_copies in changes.items()
+            )
+    finally:
+        broker.unsubscribe(subscription)
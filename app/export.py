@@ -0,0 +1,67 @@
+"""Потоковая выгрузка каталога и истории выдач в NDJSON / CSV.
+
+Строки читаются серверным курсором (``AsyncSession.stream`` с
+``yield_per``) порциями по ``EXPORT_BATCH_SIZE`` и сразу отдаются
+клиенту через ``StreamingResponse``. Выбираются только колонки таблицы,
+без создания ORM-объектов, и в памяти одновременно находится не больше
+одной порции.
+"""
+
+import csv
+import io
+import json
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(row._asdict(), default=str, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def _iter_export(db: AsyncSession, table, format: str):
+    if db.get_bind().dialect.name == "postgresql":
+        # Выгрузка длится дольше обычного statement_timeout
+        await db.execute(text("SET LOCAL statement_timeout = 0"))
+    result = await db.stream(
+        select(*table.columns)
+        .order_by(table.c.id)
+        .execution_options(yield_per=config.EXPORT_BATCH_SIZE)
+    )
+    if format == "csv":
+        yield _encode_csv([], header=list(result.keys()))
+    async for rows in result.partitions():
+        if format == "csv":
+            yield _encode_csv(rows)
+        else:
+            yield _encode_ndjson(rows)
+
+
+def export_response(db: AsyncSession, model, format: str):
+    table = model.__table__
+    return StreamingResponse(
+        _iter_export(db, table, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{table.name}.{format}"'
+            )
+        },
+    )
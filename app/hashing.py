@@ -0,0 +1,92 @@
+"""Хеширование паролей вне цикла событий.
+
+Каждый вызов bcrypt занимает десятки миллисекунд CPU, поэтому хеширование
+и проверка выполняются в отдельном ограниченном пуле (потоков или
+процессов). Если в очереди уже ``PASSWORD_HASHER_MAX_PENDING`` операций,
+новые сразу отклоняются с 503, а не копятся и не отнимают ресурсы у
+остальных запросов.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app import config, metrics
+
+# min/max_rounds равны стоимости по умолчанию: хеш с другой стоимостью
+# считается устаревшим и пересчитывается при следующем входе
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=config.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=config.BCRYPT_ROUNDS,
+)
+
+
+# Функции уровня модуля, чтобы их можно было передать в процесс-воркер
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int, executor: str):
+        if executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hasher"
+            )
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            metrics.PASSWORD_HASHER_RESULTS.labels("rejected").inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Password hashing is overloaded, retry later",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            metrics.PASSWORD_HASHER_RESULTS.labels("completed").inc()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str):
+        """Возвращает (верен ли пароль, новый хеш или None)."""
+        return await self._run(_verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_progress": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=config.PASSWORD_HASHER_WORKERS,
+    max_pending=config.PASSWORD_HASHER_MAX_PENDING,
+    executor=config.PASSWORD_HASHER_EXECUTOR,
+)
@@ -0,0 +1,139 @@
+"""Журнал приложения без записи в поток на пути запроса.
+
+Корневой логгер получает единственный ``QueueHandler``: запрос только
+кладёт запись в ограниченную очередь, а форматирование и вывод делает
+поток ``QueueListener``. Сообщения пишутся с %-аргументами и собираются
+уже в потоке вывода. Если очередь переполнена, запись отбрасывается и
+учитывается в ``dropped`` и метрике ``log_records_dropped_total``, а не
+задерживает ответ.
+
+Записи уровня INFO и ниже внутри HTTP-запроса проходят выборку по
+шаблону маршрута (``LOG_SAMPLE_RATES``), предупреждения и ошибки пишутся
+всегда. Формат вывода — JSON по строке на запись (``LOG_FORMAT=json``)
+или обычный текст.
+"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from app import config, context, metrics
+
+# Атрибуты LogRecord, которые не относятся к переданным через extra
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None)).keys()
+) | {"message", "asctime", "route"}
+
+
+def parse_sample_rates(value: str) -> dict:
+    """``"GET /books/{book_id}=0.01,POST /token=0.1"`` -> словарь долей."""
+    rates = {}
+    for item in value.split(","):
+        route, separator, rate = item.strip().rpartition("=")
+        if separator and route:
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "route", None):
+            entry["route"] = record.route
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RequestLogFilter(logging.Filter):
+    """Добавляет маршрут запроса и прореживает успешные записи."""
+
+    def __init__(self, rates: dict, default_rate: float = 1.0):
+        super().__init__()
+        self.rates = rates
+        self.default_rate = default_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request = context.current()
+        route = request.route if request is not None else None
+        record.route = route
+        if route is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(route, self.default_rate)
+        return rate >= 1 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Очередь в том же процессе: запись передаётся как есть, и
+        # сообщение форматируется уже в потоке QueueListener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.LOG_RECORDS_DROPPED.inc()
+
+
+_listener = None
+_handler = None
+
+
+def configure_logging():
+    """Подключает очередь к корневому логгеру и запускает поток вывода."""
+    global _listener, _handler
+    stop_logging()
+    output = logging.StreamHandler(sys.stdout)
+    if config.LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(
+            logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+        )
+    _handler = NonBlockingQueueHandler(
+        queue.Queue(maxsize=config.LOG_QUEUE_SIZE)
+    )
+    _handler.addFilter(
+        RequestLogFilter(
+            parse_sample_rates(config.LOG_SAMPLE_RATES),
+            config.LOG_SAMPLE_RATE,
+        )
+    )
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(config.LOG_LEVEL)
+    _listener = QueueListener(_handler.queue, output)
+    _listener.start()
+
+
+def stop_logging():
+    """Выводит оставшиеся записи и отключает очередь."""
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+
+
+atexit.register(stop_logging)
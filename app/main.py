@@ -1,90 +1,249 @@
 import logging
 import time
-from datetime import timedelta
-
-from fastapi import Depends, FastAPI, HTTPException, Query, status
+from contextlib import asynccontextmanager
+from datetime import date
+
+import orjson
+from fastapi import (
+    Depends,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-
-from app import crud, models, schemas
-from app.database import SessionLocal, engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+# diagnostics подписывается на SQL-команды из app.context
+from app import diagnostics  # noqa: F401
+from app import (
+    bulk,
+    cache,
+    config,
+    context,
+    crud,
+    events,
+    export,
+    logs,
+    metrics,
+    models,
+    schemas,
+    stats,
+)
+from app.database import (
+    check_database,
+    close_database,
+    get_db,
+    get_pool_status,
+    init_schema,
+    wait_for_database,
+)
+from app.hashing import password_hasher
+from app.pagination import NEXT_CURSOR_HEADER
+from app.responses import book_fields, page_response
 from app.security import (
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    create_access_token,
+    decode_refresh_token,
     get_current_active_user,
     get_current_admin_user,
-    get_db,
+    issue_tokens,
+    refresh_tokens,
 )
 
-logging.basicConfig(level=logging.INFO)
+logs.configure_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start = time.perf_counter()
+    attempts = await wait_for_database()
+    if await init_schema():
+        logger.info("Database schema created")
+    await events.start()
+    app.state.ready = True
+    logger.info(
+        "Application startup complete in %.2fs (%d connection attempts)",
+        time.perf_counter() - start,
+        attempts,
+    )
+    yield
+    app.state.ready = False
+    await events.stop()
+    await close_database()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+# Последний добавленный — внешний: контекст нужен метрикам и журналу
+app.add_middleware(context.RequestContextMiddleware)
+
+
+def parse_fields(fields: str, schema) -> tuple:
+    """Поля из ``?fields=`` в порядке схемы ответа; id выдаётся всегда."""
+    if not fields:
+        return ()
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field: {', '.join(sorted(unknown))}",
+        )
+    return tuple(
+        name for name in schema.model_fields if name in names or name == "id"
+    )
+
+
+def parse_ids(ids: str) -> list:
+    """id из ``?ids=`` без повторов, в порядке запроса."""
+    try:
+        parsed = [int(item) for item in ids.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    unique = list(dict.fromkeys(parsed))
+    if not unique or len(unique) > config.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Pass between 1 and {config.BATCH_MAX_IDS} ids",
+        )
+    return unique
+
+
+async def batch_response(ids: list, key, load_rows, schema) -> Response:
+    """Карточки по списку id: из кэша и одним запросом для промахов.
+
+    Отсутствующие id перечисляются в заголовке ``X-Missing-Ids``, а не
+    превращают весь ответ в 404.
+    """
+
+    async def load_many(misses):
+        return {
+            row.id: schema.model_validate(row, from_attributes=True)
+            .model_dump_json()
+            .encode()
+            for row in await load_rows(misses)
+        }
+
+    body, missing = await cache.cached_batch(ids, key, load_many)
+    headers = {}
+    if missing:
+        headers[MISSING_IDS_HEADER] = ",".join(map(str, missing))
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
+
+
+def parse_book_include(include: str = None) -> frozenset:
+    if not include:
+        return frozenset()
+    includes = frozenset(
+        name.strip() for name in include.split(",") if name.strip()
+    )
+    unknown = includes - schemas.BOOK_INCLUDES
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
+    return includes
+
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    # Живость не зависит от БД: её недоступность не повод перезапускать
+    return {"status": "ok", "pool": get_pool_status()}
 
 
-@app.on_event("startup")
-async def startup():
-    time.sleep(10)  # Добавьте задержку в 10 секунд
-    models.Base.metadata.create_all(bind=engine)
-    logger.info("Application startup complete")
+@app.get("/readyz", include_in_schema=False)
+async def readyz(response: Response):
+    ready = getattr(app.state, "ready", False) and await check_database()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "unavailable"}
 
 
 @app.post("/token", response_model=schemas.Token)
-def login_for_access_token(
-    db: Session = Depends(get_db),
+async def login_for_access_token(
+    db: AsyncSession = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
+    user = await crud.authenticate_user(
+        db, form_data.username, form_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    logger.info(f"User {user.username} logged in")
-    return {"access_token": access_token, "token_type": "bearer"}
+    tokens = await issue_tokens(db, user)
+    logger.info("User %s logged in", user.username)
+    return tokens
+
+
+@app.post("/token/refresh", response_model=schemas.Token)
+async def refresh_access_token(
+    body: schemas.TokenRefresh, db: AsyncSession = Depends(get_db)
+):
+    return await refresh_tokens(db, body.refresh_token)
+
+
+@app.post("/token/revoke")
+async def revoke_refresh_token(
+    body: schemas.TokenRefresh, db: AsyncSession = Depends(get_db)
+):
+    family_id, _ = decode_refresh_token(body.refresh_token)
+    await crud.revoke_refresh_family(db, family_id)
+    return {"detail": "Refresh token revoked"}
 
 
 @app.post("/users/", response_model=schemas.UserResponse)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    new_user = crud.create_user(db=db, user=user)
-    logger.info(f"User {new_user.username} created")
-    return new_user
+async def create_user(
+    user: schemas.UserCreate, db: AsyncSession = Depends(get_db)
+):
+    return await crud.create_user(db=db, user=user)
 
 
 @app.post("/admin/users/", response_model=schemas.UserResponse)
-def create_admin_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_username(db, username=user.username)
+async def create_admin_user(
+    user: schemas.UserCreate, db: AsyncSession = Depends(get_db)
+):
+    db_user = await crud.get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=400, detail="Username already registered"
         )
     user.is_admin = True  # Установите флаг администратора
-    new_user = crud.create_user(db=db, user=user)
-    logger.info(f"Admin user {new_user.username} created")
-    return new_user
+    return await crud.create_user(db=db, user=user)
 
 
 @app.get("/users/me/", response_model=schemas.UserResponse)
-def read_users_me(
-    current_user: models.User = Depends(get_current_active_user),
+async def read_users_me(
+    current_user: schemas.UserResponse = Depends(get_current_active_user),
 ):
     return current_user
 
 
 @app.put("/users/me/", response_model=schemas.UserResponse)
-def update_user_me(
+async def update_user_me(
     user: schemas.UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.UserResponse = Depends(get_current_active_user),
 ):
-    updated_user = crud.update_user(db=db, user_id=current_user.id, user=user)
-    logger.info(f"User {current_user.username} updated their information")
-    return updated_user
+    return await crud.update_user(
+        db=db,
+        user_id=current_user.id,
+        user=user,
+        previous_username=current_user.username,
+    )
 
 
 @app.get(
@@ -92,8 +251,62 @@ def update_user_me(
     response_model=list[schemas.UserResponse],
     dependencies=[Depends(get_current_admin_user)],
 )
-def read_users(db: Session = Depends(get_db)):
-    return crud.get_users(db=db)
+async def read_users(db: AsyncSession = Depends(get_db)):
+    return await crud.get_users(db=db)
+
+
+@app.get("/admin/db/pool", dependencies=[Depends(get_current_admin_user)])
+async def read_pool_status():
+    return get_pool_status()
+
+
+@app.get("/admin/hasher", dependencies=[Depends(get_current_admin_user)])
+async def read_hasher_status():
+    return password_hasher.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    metrics.observe_pool(get_pool_status())
+    metrics.observe_threadpool()
+    metrics.observe_hasher(password_hasher.stats())
+    metrics.observe_events(events.broker.subscriber_count())
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get(
+    "/admin/stats/users/{user_id}",
+    response_model=schemas.UserLoanStats,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def read_user_loan_stats(
+    user_id: int, db: AsyncSession = Depends(get_db)
+):
+    return await stats.get_user_loans(db, user_id)
+
+
+@app.get(
+    "/admin/stats/overdue",
+    response_model=schemas.OverdueStats,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def read_overdue_stats(
+    as_of: date = None, db: AsyncSession = Depends(get_db)
+):
+    return await stats.get_overdue(db, as_of or date.today())
+
+
+@app.get(
+    "/admin/stats/top-books",
+    response_model=list[schemas.BookBorrowStats],
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def read_top_books(
+    week: date = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    return await stats.get_top_books(db, week or date.today(), limit)
 
 
 @app.post(
@@ -101,15 +314,62 @@ def read_users(db: Session = Depends(get_db)):
     response_model=schemas.AuthorResponse,
     dependencies=[Depends(get_current_admin_user)],
 )
-def create_author(author: schemas.AuthorCreate, db: Session = Depends(get_db)):
-    new_author = crud.create_author(db=db, author=author)
-    logger.info(f"Author {new_author.name} created")
-    return new_author
+async def create_author(
+    author: schemas.AuthorCreate, db: AsyncSession = Depends(get_db)
+):
+    return await crud.create_author(db=db, author=author)
+
+
+@app.post(
+    "/authors/import",
+    response_model=schemas.ImportReport,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def import_authors(
+    file: UploadFile = File(...),
+    format: str = Query(None, pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await bulk.import_authors(
+        db=db, upload=file, format=bulk.detect_format(file, format)
+    )
+
+
+@app.get("/authors/export", dependencies=[Depends(get_current_admin_user)])
+async def export_authors(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    return export.export_response(db=db, model=models.Author, format=format)
 
 
 @app.get("/authors/{author_id}", response_model=schemas.AuthorResponse)
-def read_author(author_id: int, db: Session = Depends(get_db)):
-    return crud.get_author(db=db, author_id=author_id)
+async def read_author(
+    author_id: int,
+    request: Request,
+    fields: str = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    selected = parse_fields(fields, schemas.AuthorResponse)
+    if selected:
+        # Усечённые ответы не кэшируются: ключ зависел бы от набора полей
+        author = await crud.get_author(
+            db=db, author_id=author_id, fields=selected
+        )
+        body = orjson.dumps({name: getattr(author, name) for name in selected})
+        return cache.etag_response(request, body)
+
+    async def load():
+        author = await crud.get_author(db=db, author_id=author_id)
+        return (
+            schemas.AuthorResponse.model_validate(author, from_attributes=True)
+            .model_dump_json()
+            .encode()
+        )
+
+    return await cache.cached_response(
+        request, cache.author_key(author_id), load
+    )
 
 
 @app.put(
@@ -117,33 +377,109 @@ def read_author(author_id: int, db: Session = Depends(get_db)):
     response_model=schemas.AuthorResponse,
     dependencies=[Depends(get_current_admin_user)],
 )
-def update_author(
-    author_id: int, author: schemas.AuthorUpdate, db: Session = Depends(get_db)
+async def update_author(
+    author_id: int,
+    author: schemas.AuthorUpdate,
+    db: AsyncSession = Depends(get_db),
 ):
-    updated_author = crud.update_author(
-        db=db, author_id=author_id, author=author
-    )
-    logger.info(f"Author {updated_author.name} updated")
-    return updated_author
+    return await crud.update_author(db=db, author_id=author_id, author=author)
 
 
 @app.delete(
     "/authors/{author_id}", dependencies=[Depends(get_current_admin_user)]
 )
-def delete_author(author_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_author(db=db, author_id=author_id)
-    logger.info(f"Author with ID {author_id} deleted")
-    return result
+async def delete_author(author_id: int, db: AsyncSession = Depends(get_db)):
+    return await crud.delete_author(db=db, author_id=author_id)
 
 
 @app.get("/authors/", response_model=list[schemas.AuthorResponse])
-def read_authors(
-    skip: int = 0,
-    limit: int = 10,
+async def read_authors(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=1000),
     search: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: str = Query(None),
+    fields: str = Query(None),
+    ids: str = Query(None),
+    db: AsyncSession = Depends(get_db),
 ):
-    return crud.get_authors(db=db, skip=skip, limit=limit, search=search)
+    if ids is not None:
+        if fields or search or cursor:
+            raise HTTPException(
+                status_code=400,
+                detail="ids cannot be combined with other list parameters",
+            )
+        return await batch_response(
+            parse_ids(ids),
+            cache.author_key,
+            lambda misses: crud.get_authors_by_ids(db=db, ids=misses),
+            schemas.AuthorResponse,
+        )
+    page = await crud.get_authors(
+        db=db,
+        skip=skip,
+        limit=limit,
+        search=search,
+        cursor=cursor,
+        fields=parse_fields(fields, schemas.AuthorResponse),
+    )
+    return page_response(page)
+
+
+@app.post(
+    "/genres/",
+    response_model=schemas.GenreResponse,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def create_genre(
+    genre: schemas.GenreCreate, db: AsyncSession = Depends(get_db)
+):
+    return await crud.create_genre(db=db, genre=genre)
+
+
+@app.get("/genres/", response_model=list[schemas.GenreResponse])
+async def read_genres(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    page = await crud.get_genres(db=db, skip=skip, limit=limit, cursor=cursor)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+@app.get("/genres/facets", response_model=list[schemas.GenreFacet])
+async def read_genre_facets(
+    search: str = Query(None), db: AsyncSession = Depends(get_db)
+):
+    return await crud.get_genre_facets(db=db, search=search)
+
+
+@app.get("/genres/{genre_id}", response_model=schemas.GenreResponse)
+async def read_genre(genre_id: int, db: AsyncSession = Depends(get_db)):
+    return await crud.get_genre(db=db, genre_id=genre_id)
+
+
+@app.put(
+    "/genres/{genre_id}",
+    response_model=schemas.GenreResponse,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def update_genre(
+    genre_id: int,
+    genre: schemas.GenreUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    return await crud.update_genre(db=db, genre_id=genre_id, genre=genre)
+
+
+@app.delete(
+    "/genres/{genre_id}", dependencies=[Depends(get_current_admin_user)]
+)
+async def delete_genre(genre_id: int, db: AsyncSession = Depends(get_db)):
+    return await crud.delete_genre(db=db, genre_id=genre_id)
 
 
 @app.post(
@@ -151,15 +487,95 @@ def read_authors(
     response_model=schemas.BookResponse,
     dependencies=[Depends(get_current_admin_user)],
 )
-def create_book(book: schemas.BookCreate, db: Session = Depends(get_db)):
-    new_book = crud.create_book(db=db, book=book)
-    logger.info(f"Book {new_book.title} created")
-    return new_book
+async def create_book(
+    book: schemas.BookCreate, db: AsyncSession = Depends(get_db)
+):
+    return await crud.create_book(db=db, book=book)
+
+
+@app.post(
+    "/books/import",
+    response_model=schemas.ImportReport,
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def import_books(
+    file: UploadFile = File(...),
+    format: str = Query(None, pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await bulk.import_books(
+        db=db, upload=file, format=bulk.detect_format(file, format)
+    )
+
+
+@app.get("/books/export", dependencies=[Depends(get_current_admin_user)])
+async def export_books(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    return export.export_response(db=db, model=models.Book, format=format)
+
+
+@app.get("/books/availability")
+async def stream_availability(
+    ids: str = Query(...), db: AsyncSession = Depends(get_db)
+):
+    """Server-sent events с ``available_copies`` книг из ``ids``."""
+    book_ids = parse_ids(ids)
+    # Подписка раньше снимка: изменение между ними не потеряется
+    subscription = events.broker.subscribe(book_ids)
+    try:
+        snapshot = await crud.get_availability(db, book_ids)
+    except BaseException:
+        events.broker.unsubscribe(subscription)
+        raise
+    finally:
+        # Соединение не держится открытым, пока идёт поток
+        await db.close()
+    return StreamingResponse(
+        events.stream(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(events.broker.unsubscribe, subscription),
+    )
 
 
-@app.get("/books/{book_id}", response_model=schemas.BookResponse)
-def read_book(book_id: int, db: Session = Depends(get_db)):
-    return crud.get_book(db=db, book_id=book_id)
+@app.get("/books/{book_id}", response_model=schemas.BookExpandedResponse)
+async def read_book(
+    book_id: int,
+    request: Request,
+    include: str = Query(None),
+    fields: str = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    includes = parse_book_include(include)
+    selected = parse_fields(fields, schemas.BookResponse)
+    if selected:
+        book = await crud.get_book(
+            db=db, book_id=book_id, include=includes, fields=selected
+        )
+        body = orjson.dumps(book_fields(book, selected, includes))
+        return cache.etag_response(request, body)
+    if includes:
+        # Вложенные объекты меняются независимо от книги, поэтому такой
+        # ответ не кэшируется, но по-прежнему поддерживает ETag
+        book = await crud.get_book(db=db, book_id=book_id, include=includes)
+        body = (
+            schemas.BookExpandedResponse.from_book(book, includes)
+            .model_dump_json(exclude_unset=True)
+            .encode()
+        )
+        return cache.etag_response(request, body)
+
+    async def load():
+        book = await crud.get_book(db=db, book_id=book_id)
+        return (
+            schemas.BookResponse.model_validate(book, from_attributes=True)
+            .model_dump_json()
+            .encode()
+        )
+
+    return await cache.cached_response(request, cache.book_key(book_id), load)
 
 
 @app.put(
@@ -167,29 +583,94 @@ def read_book(book_id: int, db: Session = Depends(get_db)):
     response_model=schemas.BookResponse,
     dependencies=[Depends(get_current_admin_user)],
 )
-def update_book(
-    book_id: int, book: schemas.BookUpdate, db: Session = Depends(get_db)
+async def update_book(
+    book_id: int, book: schemas.BookUpdate, db: AsyncSession = Depends(get_db)
 ):
-    updated_book = crud.update_book(db=db, book_id=book_id, book=book)
-    logger.info(f"Book {updated_book.title} updated")
-    return updated_book
+    return await crud.update_book(db=db, book_id=book_id, book=book)
 
 
 @app.delete("/books/{book_id}", dependencies=[Depends(get_current_admin_user)])
-def delete_book(book_id: int, db: Session = Depends(get_db)):
-    result = crud.delete_book(db=db, book_id=book_id)
-    logger.info(f"Book with ID {book_id} deleted")
-    return result
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_db)):
+    return await crud.delete_book(db=db, book_id=book_id)
 
 
-@app.get("/books/", response_model=list[schemas.BookResponse])
-def read_books(
-    skip: int = 0,
-    limit: int = 10,
+@app.put(
+    "/books/{book_id}/genres/{genre_id}",
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def add_book_genre(
+    book_id: int, genre_id: int, db: AsyncSession = Depends(get_db)
+):
+    return await crud.add_book_genre(db=db, book_id=book_id, genre_id=genre_id)
+
+
+@app.delete(
+    "/books/{book_id}/genres/{genre_id}",
+    dependencies=[Depends(get_current_admin_user)],
+)
+async def remove_book_genre(
+    book_id: int, genre_id: int, db: AsyncSession = Depends(get_db)
+):
+    return await crud.remove_book_genre(
+        db=db, book_id=book_id, genre_id=genre_id
+    )
+
+
+@app.get(
+    "/books/",
+    response_model=list[schemas.BookExpandedResponse],
+    response_model_exclude_unset=True,
+)
+async def read_books(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=1000),
     search: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: str = Query(None),
+    include: str = Query(None),
+    genre: int = Query(None),
+    fields: str = Query(None),
+    ids: str = Query(None),
+    db: AsyncSession = Depends(get_db),
 ):
-    return crud.get_books(db=db, skip=skip, limit=limit, search=search)
+    if ids is not None:
+        if include or fields or search or cursor or genre is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="ids cannot be combined with other list parameters",
+            )
+        # Те же карточки, что у GET /books/{book_id}, и тот же кэш
+        return await batch_response(
+            parse_ids(ids),
+            cache.book_key,
+            lambda misses: crud.get_books_by_ids(db=db, ids=misses),
+            schemas.BookResponse,
+        )
+    includes = parse_book_include(include)
+    selected = parse_fields(fields, schemas.BookResponse)
+    page = await crud.get_books(
+        db=db,
+        skip=skip,
+        limit=limit,
+        search=search,
+        cursor=cursor,
+        include=includes,
+        genre=genre,
+        fields=selected,
+    )
+    # Без связей — строки колонок, сериализуемые без response_model
+    if not includes:
+        return page_response(page)
+    if selected:
+        return page_response(
+            page, lambda book: book_fields(book, selected, includes)
+        )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return [
+        schemas.BookExpandedResponse.from_book(book, includes)
+        for book in page.items
+    ]
 
 
 @app.post(
@@ -197,14 +678,10 @@ def read_books(
     response_model=schemas.BookIssueResponse,
     dependencies=[Depends(get_current_active_user)],
 )
-def create_book_issue(
-    book_issue: schemas.BookIssueCreate, db: Session = Depends(get_db)
+async def create_book_issue(
+    book_issue: schemas.BookIssueCreate, db: AsyncSession = Depends(get_db)
 ):
-    new_issue = crud.create_book_issue(db=db, book_issue=book_issue)
-    logger.info(
-        f"Book with ID {new_issue.book_id} issued to user with ID {new_issue.user_id}"
-    )
-    return new_issue
+    return await crud.create_book_issue(db=db, book_issue=book_issue)
 
 
 @app.put(
@@ -212,25 +689,33 @@ def create_book_issue(
     response_model=schemas.BookIssueResponse,
     dependencies=[Depends(get_current_active_user)],
 )
-def update_book_issue(
+async def update_book_issue(
     book_issue_id: int,
     book_issue: schemas.BookIssueUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    updated_issue = crud.update_book_issue(
+    return await crud.update_book_issue(
         db=db, book_issue_id=book_issue_id, book_issue=book_issue
     )
-    logger.info(f"Book issue with ID {book_issue_id} updated")
-    return updated_issue
 
 
-@app.get(
-    "/book_issues/",
-    response_model=list[schemas.BookIssueResponse],
-    dependencies=[Depends(get_current_active_user)],
-)
-def read_book_issues(
-    current_user: models.User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+@app.get("/book_issues/export", dependencies=[Depends(get_current_admin_user)])
+async def export_book_issues(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
 ):
-    return crud.get_book_issues(db=db, user_id=current_user.id)
+    return export.export_response(db=db, model=models.BookIssue, format=format)
+
+
+@app.get("/book_issues/", response_model=list[schemas.BookIssueResponse])
+async def read_book_issues(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None),
+    current_user: schemas.UserResponse = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    page = await crud.get_book_issues(
+        db=db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor
+    )
+    return page_response(page)
@@ -0,0 +1,185 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+``MetricsMiddleware`` замеряет каждый запрос: время по шаблону маршрута
+(``/books/{book_id}``, а не конкретный путь), число запросов в работе и
+коды ответов. Число SQL-команд и их время в рамках запроса берутся из
+``app.context``, поэтому видно, какая часть задержки приходится на
+базу. Монотонные значения (тайм-ауты пула, результаты хеширования,
+отброшенные записи журнала) — счётчики с суффиксом ``_total``, их
+увеличивает место события. Состояние пула соединений, пула потоков и
+хеширования паролей снимается в момент запроса ``/metrics``.
+"""
+
+import time
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from app import context
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+REQUESTS = Counter(
+    "http_requests",
+    "HTTP requests by route and status code.",
+    ("method", "route", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body chunk.",
+    ("method", "route"),
+    buckets=LATENCY_BUCKETS,
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being processed.",
+    ("method",),
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Total SQL execution time per request.",
+    ("method", "route"),
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "Connection pool state at scrape time.",
+    ("state",),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Connection checkouts that failed with a pool timeout.",
+)
+THREADPOOL = Gauge(
+    "threadpool_tasks",
+    "Default AnyIO worker thread pool usage at scrape time.",
+    ("state",),
+)
+PASSWORD_HASHER = Gauge(
+    "password_hasher_tasks",
+    "Password hasher pool usage at scrape time.",
+    ("state",),
+)
+PASSWORD_HASHER_RESULTS = Counter(
+    "password_hasher_results",
+    "Password hashing tasks by result: completed or rejected.",
+    ("result",),
+)
+# Оба ряда существуют с нуля, чтобы rate() видел первое отклонение
+for _result in ("completed", "rejected"):
+    PASSWORD_HASHER_RESULTS.labels(_result)
+EVENT_SUBSCRIBERS = Gauge(
+    "availability_stream_subscribers",
+    "Open book availability streams in this process.",
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped",
+    "Log records dropped because the logging queue was full.",
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: замеры без буферизации тела ответа.
+
+    Работает внутри ``context.RequestContextMiddleware``: маршрут и
+    статистику SQL берёт из контекста запроса.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        request = context.current()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = request.route_template
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_DURATION.labels(method, route).observe(elapsed)
+            REQUEST_DB_STATEMENTS.labels(method, route).observe(
+                request.statements
+            )
+            REQUEST_DB_DURATION.labels(method, route).observe(
+                request.db_seconds
+            )
+
+
+def observe_pool(status: dict):
+    for state in ("size", "checked_out", "overflow"):
+        if state in status:
+            DB_POOL.labels(state).set(status[state])
+
+
+def observe_threadpool():
+    limiter = to_thread.current_default_thread_limiter()
+    statistics = limiter.statistics()
+    THREADPOOL.labels("limit").set(limiter.total_tokens)
+    THREADPOOL.labels("busy").set(statistics.borrowed_tokens)
+    THREADPOOL.labels("waiting").set(statistics.tasks_waiting)
+
+
+def observe_hasher(stats: dict):
+    for state in ("in_progress", "queued"):
+        PASSWORD_HASHER.labels(state).set(stats[state])
+
+
+def observe_events(subscribers: int):
+    EVENT_SUBSCRIBERS.set(subscribers)
@@ -2,7 +2,9 @@ from sqlalchemy import (
     Boolean,
     Column,
     Date,
+    DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -21,6 +23,26 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
 
 
+class RefreshToken(Base):
+    """Активное семейство refresh-токенов одного входа пользователя.
+
+    Каждое обновление увеличивает ``generation``. Токен прежнего
+    поколения означает повторное использование, и семейство удаляется;
+    отозванных строк таблица не хранит.
+    """
+
+    __tablename__ = 'refresh_tokens'
+    family_id = Column(String(32), primary_key=True)
+    user_id = Column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+    )
+    generation = Column(Integer, nullable=False, default=0)
+    expires_at = Column(DateTime, nullable=False)
+
+
 class Author(Base):
     __tablename__ = 'authors'
     id = Column(Integer, primary_key=True, index=True)
@@ -38,11 +60,35 @@ class Genre(Base):
 book_genres = Table(
     'book_genres',
     Base.metadata,
-    Column('book_id', Integer, ForeignKey('books.id')),
-    Column('genre_id', Integer, ForeignKey('genres.id')),
+    Column(
+        'book_id',
+        Integer,
+        ForeignKey('books.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    Column(
+        'genre_id',
+        Integer,
+        ForeignKey('genres.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    # Книги жанра читаются по индексу в порядке id
+    Index('ix_book_genres_genre_id_book_id', 'genre_id', 'book_id'),
 )
 
 
+class GenreBookCount(Base):
+    """Число книг в жанре; поддерживается при изменении book_genres."""
+
+    __tablename__ = 'genre_book_counts'
+    genre_id = Column(
+        Integer,
+        ForeignKey('genres.id', ondelete='CASCADE'),
+        primary_key=True,
+    )
+    book_count = Column(Integer, nullable=False, default=0)
+
+
 class Book(Base):
     __tablename__ = 'books'
     id = Column(Integer, primary_key=True, index=True)
@@ -50,18 +96,57 @@ class Book(Base):
     description = Column(String)
     publication_date = Column(Date)
     available_copies = Column(Integer)
-    author_id = Column(Integer, ForeignKey('authors.id'))
+    author_id = Column(Integer, ForeignKey('authors.id'), index=True)
     author = relationship("Author")
     genres = relationship("Genre", secondary="book_genres")
 
 
 class BookIssue(Base):
     __tablename__ = 'book_issues'
+    # Выдачи пользователя листаются по (user_id, id)
+    __table_args__ = (Index('ix_book_issues_user_id_id', 'user_id', 'id'),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'))
-    book_id = Column(Integer, ForeignKey('books.id'))
+    book_id = Column(Integer, ForeignKey('books.id'), index=True)
     issue_date = Column(Date)
     return_date = Column(Date)
     expected_return_date = Column(Date)
     user = relationship("User")
     book = relationship("Book")
+
+
+class UserLoanStats(Base):
+    """Сводка выдач пользователя; обновляется при выдаче и возврате."""
+
+    __tablename__ = 'user_loan_stats'
+    user_id = Column(
+        Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True
+    )
+    open_loans = Column(Integer, nullable=False, default=0)
+    total_loans = Column(Integer, nullable=False, default=0)
+
+
+class LoanDueCount(Base):
+    """Число невозвращённых книг по ожидаемой дате возврата."""
+
+    __tablename__ = 'loan_due_counts'
+    due_date = Column(Date, primary_key=True)
+    open_loans = Column(Integer, nullable=False, default=0)
+
+
+class BookWeeklyBorrows(Base):
+    """Число выдач книги за неделю (week_start — понедельник)."""
+
+    __tablename__ = 'book_weekly_borrows'
+    __table_args__ = (
+        Index(
+            'ix_book_weekly_borrows_week_start_borrow_count',
+            'week_start',
+            'borrow_count',
+        ),
+    )
+    week_start = Column(Date, primary_key=True)
+    book_id = Column(
+        Integer, ForeignKey('books.id', ondelete='CASCADE'), primary_key=True
+    )
+    borrow_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,61 @@
+"""Курсорная (keyset) пагинация списков.
+
+Страницы упорядочены по ``id``; курсор — непрозрачная base64-строка с
+``id`` последней записи страницы. Следующая страница выбирается
+условием ``id > :last_id`` и читается по индексу первичного ключа,
+поэтому её стоимость не зависит от глубины.
+"""
+
+import base64
+import binascii
+import json
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    items: List
+    next_cursor: Optional[str]
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def paginate(
+    query, model, skip: int, limit: int, cursor: Optional[str] = None
+):
+    """Упорядочивает запрос по id и ограничивает его одной страницей.
+
+    Выбирается на одну строку больше ``limit``, чтобы понять, есть ли
+    следующая страница; лишнюю строку отбрасывает ``make_page``.
+    """
+    query = query.order_by(model.id)
+    if cursor is not None:
+        query = query.filter(model.id > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def make_page(rows, limit: int) -> Page:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return Page(rows, None)
+    items = rows[:limit]
+    return Page(items, encode_cursor(items[-1].id))
@@ -0,0 +1,55 @@
+"""Быстрый путь сериализации списков.
+
+Списки читаются ``select()`` только нужных колонок (без ORM-объектов),
+строки превращаются в словари и кодируются orjson. Обработчик
+возвращает готовый ``Response``, поэтому FastAPI не проверяет ответ
+повторно через ``response_model``: колонки выбраны по полям схемы, и
+форма ответа совпадает с ней по построению. ``response_model`` в
+декораторе остаётся для документации OpenAPI.
+"""
+
+from fastapi.responses import ORJSONResponse
+
+from app import schemas
+from app.pagination import NEXT_CURSOR_HEADER, Page
+
+
+def columns_for(model, schema, fields=()) -> list:
+    """Колонки модели для полей схемы ответа (или только ``fields``)."""
+    return [getattr(model, name) for name in fields or schema.model_fields]
+
+
+def _row_dict(row) -> dict:
+    return row._asdict()
+
+
+def page_response(page: Page, render=_row_dict) -> ORJSONResponse:
+    response = ORJSONResponse([render(item) for item in page.items])
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return response
+
+
+def book_fields(book, fields, include=frozenset()) -> dict:
+    """Словарь ответа с полями ``fields`` книги и запрошенными связями.
+
+    Читаются только загруженные атрибуты: у книги, выбранной с
+    ``load_only``, остальные колонки не загружены.
+    """
+    data = {name: getattr(book, name) for name in fields}
+    if "author" in include:
+        data["author"] = (
+            schemas.AuthorResponse.model_validate(
+                book.author, from_attributes=True
+            ).model_dump()
+            if book.author
+            else None
+        )
+    if "genres" in include:
+        data["genres"] = [
+            schemas.GenreResponse.model_validate(
+                genre, from_attributes=True
+            ).model_dump()
+            for genre in book.genres
+        ]
+    return data
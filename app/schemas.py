@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import List, Optional, Union
 
 from pydantic import BaseModel
 
@@ -7,6 +7,11 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -82,6 +87,53 @@ class BookResponse(BookBase):
         orm_mode = True
 
 
+class GenreBase(BaseModel):
+    name: str
+
+
+class GenreCreate(GenreBase):
+    pass
+
+
+class GenreUpdate(GenreBase):
+    pass
+
+
+class GenreResponse(GenreBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+
+class GenreFacet(GenreResponse):
+    book_count: int
+
+
+# Связанные объекты, которые можно запросить параметром include
+BOOK_INCLUDES = frozenset({"author", "genres"})
+
+
+class BookExpandedResponse(BookResponse):
+    author: Optional[AuthorResponse] = None
+    genres: Optional[List[GenreResponse]] = None
+
+    @classmethod
+    def from_book(cls, book, include=frozenset()):
+        """Строит ответ, читая у книги только запрошенные связи.
+
+        Незапрошенные связи не загружены, и обращение к ним вызвало бы
+        ленивую загрузку; они не попадают в fields_set и отбрасываются
+        при сериализации с exclude_unset.
+        """
+        fields = BookResponse.model_validate(
+            book, from_attributes=True
+        ).model_dump()
+        for name in include:
+            fields[name] = getattr(book, name)
+        return cls.model_validate(fields, from_attributes=True)
+
+
 class BookIssueBase(BaseModel):
     user_id: int
     book_id: int
@@ -103,3 +155,32 @@ class BookIssueResponse(BookIssueBase):
 
     class Config:
         orm_mode = True
+
+
+class UserLoanStats(BaseModel):
+    user_id: int
+    open_loans: int
+    total_loans: int
+
+
+class OverdueStats(BaseModel):
+    as_of: date
+    overdue_loans: int
+
+
+class BookBorrowStats(BaseModel):
+    book_id: int
+    week_start: date
+    borrow_count: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: Union[str, List[dict]]
+
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
@@ -0,0 +1,151 @@
+"""Полнотекстовый поиск по книгам и авторам.
+
+На PostgreSQL у таблицы есть вычисляемая колонка ``search_vector``
+(tsvector) с GIN-индексом и триграммный индекс по основному полю для
+нечёткого совпадения. На SQLite используется внешняя таблица FTS5,
+которую поддерживают в актуальном состоянии триггеры. Индексы
+обновляются самой БД при любом INSERT/UPDATE/DELETE, поэтому crud
+ничего дополнительно не делает.
+"""
+
+import re
+
+from sqlalchemy import DDL, event, false, func, literal_column, or_, table
+from sqlalchemy.sql import column
+
+from app import models
+
+# Основное (больший вес) и дополнительное поле для каждой модели
+SEARCH_FIELDS = {
+    models.Book: ("title", "description"),
+    models.Author: ("name", "biography"),
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SEARCH_VECTOR = "search_vector"
+
+
+def search_indexes(tablename: str, primary: str) -> tuple:
+    """Имена GIN-индексов PostgreSQL: tsvector и триграммный."""
+    return (
+        f"ix_{tablename}_{SEARCH_VECTOR}",
+        f"ix_{tablename}_{primary}_trgm",
+    )
+
+
+def unmanaged_objects() -> dict:
+    """Объекты поиска PostgreSQL, которых нет в моделях, по типу.
+
+    Их создаёт DDL ниже и ревизия b7e41c2d9a03; Alembic autogenerate не
+    должен предлагать их удалить.
+    """
+    objects = {"column": {SEARCH_VECTOR}, "index": set()}
+    for model, (primary, _) in SEARCH_FIELDS.items():
+        objects["index"].update(search_indexes(model.__tablename__, primary))
+    return objects
+
+
+def postgresql_ddl(tablename: str, primary: str, secondary: str) -> list:
+    vector_index, trgm_index = search_indexes(tablename, primary)
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"ALTER TABLE {tablename} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR} "
+        f"tsvector GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('simple', coalesce({primary}, '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce({secondary}, '')), 'B')"
+        f") STORED",
+        f"CREATE INDEX IF NOT EXISTS {vector_index} "
+        f"ON {tablename} USING gin ({SEARCH_VECTOR})",
+        f"CREATE INDEX IF NOT EXISTS {trgm_index} "
+        f"ON {tablename} USING gin ({primary} gin_trgm_ops)",
+    ]
+
+
+def sqlite_ddl(tablename: str, primary: str, secondary: str) -> list:
+    fts = f"{tablename}_fts"
+    insert = (
+        f"INSERT INTO {fts}(rowid, {primary}, {secondary}) "
+        f"VALUES (new.id, new.{primary}, new.{secondary});"
+    )
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {primary}, {secondary}) "
+        f"VALUES ('delete', old.id, old.{primary}, old.{secondary});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{primary}, {secondary}, content='{tablename}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tablename} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tablename} "
+        f"BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF "
+        f"{primary}, {secondary} ON {tablename} BEGIN {delete} {insert} END",
+    ]
+
+
+for _model, (_primary, _secondary) in SEARCH_FIELDS.items():
+    _table = _model.__table__
+    for _statement in postgresql_ddl(_table.name, _primary, _secondary):
+        event.listen(
+            _table,
+            "after_create",
+            DDL(_statement).execute_if(dialect="postgresql"),
+        )
+    for _statement in sqlite_ddl(_table.name, _primary, _secondary):
+        event.listen(
+            _table,
+            "after_create",
+            DDL(_statement).execute_if(dialect="sqlite"),
+        )
+    event.listen(
+        _table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table.name}_fts").execute_if(
+            dialect="sqlite"
+        ),
+    )
+
+
+def _fts5_query(search: str):
+    # Каждое слово ищется как префикс; кавычки экранируют синтаксис FTS5
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def apply_search(query, model, search: str, dialect: str):
+    """Добавляет к запросу фильтр и сортировку по релевантности."""
+    primary_name, secondary_name = SEARCH_FIELDS[model]
+    primary = getattr(model, primary_name)
+    secondary = getattr(model, secondary_name)
+    tablename = model.__tablename__
+
+    if dialect == "postgresql":
+        vector = literal_column(f"{tablename}.search_vector")
+        tsquery = func.websearch_to_tsquery(
+            literal_column("'simple'::regconfig"), search
+        )
+        rank = func.ts_rank(vector, tsquery) + func.similarity(primary, search)
+        return query.filter(
+            or_(vector.op("@@")(tsquery), primary.op("%")(search))
+        ).order_by(rank.desc(), model.id)
+
+    if dialect == "sqlite":
+        match = _fts5_query(search)
+        if match is None:
+            return query.filter(false())
+        fts = table(f"{tablename}_fts", column("rowid"))
+        fts_column = literal_column(fts.name)
+        # bm25 меньше — релевантнее; совпадение в основном поле весомее
+        rank = func.bm25(fts_column, 10.0, 1.0)
+        return (
+            query.join(fts, fts.c.rowid == model.id)
+            .filter(fts_column.op("MATCH")(match))
+            .order_by(rank, model.id)
+        )
+
+    return query.filter(
+        or_(primary.ilike(f"%{search}%"), secondary.ilike(f"%{search}%"))
+    ).order_by(model.id)
@@ -4,10 +4,11 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models
-from app.database import SessionLocal
+from app import config, crud, schemas
+from app.cache import principal_cache
+from app.database import get_db
 
 # Конфигурация
 SECRET_KEY = "your_secret_key"
@@ -28,17 +29,85 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_db():
-    db = SessionLocal()
+def _refresh_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+def create_refresh_token(family_id: str, generation: int, expire: datetime):
+    to_encode = {
+        "type": "refresh",
+        "fam": family_id,
+        "gen": generation,
+        "exp": expire,
+    }
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_refresh_token(token: str):
+    """Проверяет подпись и срок; возвращает (семейство, поколение)."""
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+    )
     try:
-        yield db
-    finally:
-        db.close()
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise invalid
+    family_id = payload.get("fam")
+    generation = payload.get("gen")
+    if (
+        payload.get("type") != "refresh"
+        or not isinstance(family_id, str)
+        or not isinstance(generation, int)
+    ):
+        raise invalid
+    return family_id, generation
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+def _token_pair(username: str, family_id: str, generation: int, expire):
+    access_token = create_access_token(
+        data={"sub": username},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(family_id, generation, expire),
+        "token_type": "bearer",
+    }
+
+
+async def issue_tokens(db: AsyncSession, user) -> dict:
+    """Токены после входа по паролю: новое семейство refresh-токенов."""
+    expire = _refresh_expiry()
+    family_id = await crud.create_refresh_family(db, user.id, expire)
+    return _token_pair(user.username, family_id, 0, expire)
+
+
+async def refresh_tokens(db: AsyncSession, refresh_token: str) -> dict:
+    """Новая пара токенов по refresh-токену.
+
+    Проверка — подпись HMAC и одна команда UPDATE; пароль и bcrypt не
+    участвуют. Предъявленный токен после этого недействителен.
+    """
+    family_id, generation = decode_refresh_token(refresh_token)
+    expire = _refresh_expiry()
+    username = await crud.rotate_refresh_family(
+        db, family_id, generation, expire
+    )
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    return _token_pair(username, family_id, generation + 1, expire)
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
 ):
+    # В пределах запроса результат кэширует сам FastAPI (use_cache),
+    # между запросами — principal_cache
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -47,26 +116,33 @@ def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Refresh-токен не заменяет токен доступа
+        if username is None or payload.get("type") == "refresh":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_username(db, username=username)
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await crud.get_user_by_username(db, username=username)
+        if user is None:
+            raise credentials_exception
+        principal = schemas.UserResponse.model_validate(
+            user, from_attributes=True
+        )
+        principal_cache.set(username, principal)
+    return principal
 
 
-def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
+async def get_current_active_user(
+    current_user: schemas.UserResponse = Depends(get_current_user),
 ):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_admin_user(
-    current_user: models.User = Depends(get_current_user),
+async def get_current_admin_user(
+    current_user: schemas.UserResponse = Depends(get_current_active_user),
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -0,0 +1,135 @@
+"""Статистика выдач, поддерживаемая инкрементально.
+
+``record_checkout`` и ``record_return`` вызываются из crud в той же
+транзакции, что и изменение ``book_issues``, и атомарно увеличивают или
+уменьшают счётчики в сводных таблицах. Отчёты читают готовые строки
+сводок и не зависят от длины истории выдач.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+async def _increment(db: AsyncSession, model, keys: dict, deltas: dict):
+    """UPSERT: увеличивает счётчики строки или создаёт её."""
+    dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(model).values(**keys, **deltas)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                name: getattr(model, name) + getattr(statement.excluded, name)
+                for name in deltas
+            },
+        )
+        await db.execute(statement)
+        return
+    result = await db.execute(
+        update(model)
+        .filter_by(**keys)
+        .values(
+            {
+                name: getattr(model, name) + delta
+                for name, delta in deltas.items()
+            }
+        )
+    )
+    if result.rowcount == 0:
+        db.add(model(**keys, **deltas))
+        await db.flush()
+
+
+async def record_checkout(db: AsyncSession, book_issue: models.BookIssue):
+    await _increment(
+        db,
+        models.UserLoanStats,
+        {"user_id": book_issue.user_id},
+        {"open_loans": 1, "total_loans": 1},
+    )
+    if book_issue.expected_return_date:
+        await _increment(
+            db,
+            models.LoanDueCount,
+            {"due_date": book_issue.expected_return_date},
+            {"open_loans": 1},
+        )
+    if book_issue.issue_date:
+        await _increment(
+            db,
+            models.BookWeeklyBorrows,
+            {
+                "week_start": week_start(book_issue.issue_date),
+                "book_id": book_issue.book_id,
+            },
+            {"borrow_count": 1},
+        )
+
+
+async def record_return(
+    db: AsyncSession, user_id: int, expected_return_date: date
+):
+    await _increment(
+        db, models.UserLoanStats, {"user_id": user_id}, {"open_loans": -1}
+    )
+    if expected_return_date:
+        await _increment(
+            db,
+            models.LoanDueCount,
+            {"due_date": expected_return_date},
+            {"open_loans": -1},
+        )
+        # Даты без открытых выдач не остаются в сводке навсегда
+        await db.execute(
+            delete(models.LoanDueCount).filter(
+                models.LoanDueCount.due_date == expected_return_date,
+                models.LoanDueCount.open_loans == 0,
+            )
+        )
+
+
+async def get_user_loans(db: AsyncSession, user_id: int) -> dict:
+    stats = await db.get(models.UserLoanStats, user_id)
+    return {
+        "user_id": user_id,
+        "open_loans": stats.open_loans if stats else 0,
+        "total_loans": stats.total_loans if stats else 0,
+    }
+
+
+async def get_overdue(db: AsyncSession, as_of: date) -> dict:
+    # Строк столько, сколько различных дат возврата, а не выдач
+    overdue = await db.scalar(
+        select(
+            func.coalesce(func.sum(models.LoanDueCount.open_loans), 0)
+        ).filter(models.LoanDueCount.due_date < as_of)
+    )
+    return {"as_of": as_of, "overdue_loans": overdue}
+
+
+async def get_top_books(db: AsyncSession, day: date, limit: int = 10):
+    week = week_start(day)
+    result = await db.execute(
+        select(
+            models.BookWeeklyBorrows.book_id,
+            models.BookWeeklyBorrows.week_start,
+            models.BookWeeklyBorrows.borrow_count,
+        )
+        .filter(models.BookWeeklyBorrows.week_start == week)
+        .order_by(
+            models.BookWeeklyBorrows.borrow_count.desc(),
+            models.BookWeeklyBorrows.book_id,
+        )
+        .limit(limit)
+    )
+    return result.mappings().all()
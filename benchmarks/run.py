@@ -0,0 +1,261 @@
+"""Нагрузочный прогон всех маршрутов с проверкой регрессий.
+
+По умолчанию приложение вызывается в том же процессе через
+``httpx.ASGITransport`` и работает с базой из ``DATABASE_URL`` /
+``ASYNC_DATABASE_URL``; с ``--url`` запросы идут на запущенный сервер.
+Перед прогоном база заполняется ``benchmarks.seed`` с теми же
+размерами::
+
+    python -m benchmarks.seed --database-url "$DATABASE_URL" \\
+        --drop-existing --books 100000
+    python -m benchmarks.run --books 100000 --save-baseline baseline.json
+    # после изменений, на той же базе и с теми же параметрами
+    python -m benchmarks.run --books 100000 --baseline baseline.json
+
+Для каждого сценария печатаются p50/p95/p99 (мс) и запросы в секунду.
+С ``--baseline`` прогон завершается с кодом 1, если p50 и p95 выросли
+больше чем на ``--tolerance``, либо если были неожиданные ответы;
+``--save-baseline`` записывает результаты как новый эталон. Эталон в
+репозитории не хранится: задержки зависят от СУБД, машины и данных,
+поэтому сравнивать можно только с прогоном на том же окружении.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.scenarios import SCENARIOS, Context, Scenario
+from benchmarks.seed import (
+    ADMIN_USERNAME,
+    DEFAULT_SIZES,
+    PASSWORD,
+    add_size_arguments,
+    user_username,
+)
+
+# Разница задержек меньше этой величины считается шумом
+MIN_DELTA_MS = 2.0
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentile по методу ближайшего ранга; values отсортированы."""
+    if not values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> dict:
+    response = await client.post(
+        "/token", data={"username": username, "password": PASSWORD}
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _request(client, ctx, scenario, latencies, unexpected):
+    try:
+        options = scenario.build(ctx)
+    except LookupError:
+        # Записи, созданные предыдущими сценариями, закончились
+        return
+    start = time.perf_counter()
+    response = await client.request(scenario.method, **options)
+    latencies.append((time.perf_counter() - start) * 1000)
+    if response.status_code not in scenario.expected:
+        status = str(response.status_code)
+        unexpected[status] = unexpected.get(status, 0) + 1
+    elif scenario.record:
+        scenario.record(ctx, response)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> dict:
+    if scenario.max_requests is not None:
+        requests = min(requests, scenario.max_requests)
+    latencies = []
+    unexpected = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            await _request(client, ctx, scenario, latencies, unexpected)
+
+    # Прогрев: первые запросы заполняют кэши и пул и в замеры не входят
+    for _ in range(min(warmup, requests)):
+        await _request(client, ctx, scenario, [], {})
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "unexpected": unexpected,
+    }
+
+
+async def run(args, sizes: dict) -> dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from app.main import app
+
+        # Ошибки приложения считаются ответами 500, а не прерывают прогон
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url = "http://benchmark"
+
+    ctx = Context(sizes, args.seed, uuid.uuid4().hex[:8])
+    selected = [
+        scenario
+        for scenario in SCENARIOS
+        if not args.only or scenario.name in args.only
+    ]
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        ctx.admin = await _login(client, ADMIN_USERNAME)
+        ctx.user = await _login(client, user_username(2))
+        for scenario in selected:
+            results[scenario.name] = await run_scenario(
+                client,
+                ctx,
+                scenario,
+                args.requests,
+                args.concurrency,
+                args.warmup,
+            )
+            print(_format_row(scenario.name, results[scenario.name]))
+    return results
+
+
+def _format_row(name: str, result: dict) -> str:
+    unexpected = ", ".join(
+        f"{status}x{count}" for status, count in result["unexpected"].items()
+    )
+    return (
+        f"{name:<22} {result['requests']:>7} {result['rps']:>9.1f} "
+        f"{result['p50']:>9.2f} {result['p95']:>9.2f} {result['p99']:>9.2f}"
+        f"  {unexpected}"
+    )
+
+
+def _exceeds(value: float, base: float, tolerance: float) -> bool:
+    return value > max(base * (1 + tolerance), base + MIN_DELTA_MS)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Возвращает описания регрессий относительно эталона.
+
+    Регрессией считается рост и медианы, и p95: одиночные выбросы
+    сдвигают только хвост распределения.
+    """
+    problems = []
+    for name, result in results.items():
+        if result["unexpected"]:
+            problems.append(
+                f"{name}: unexpected responses {result['unexpected']}"
+            )
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if _exceeds(result["p50"], base["p50"], tolerance) and _exceeds(
+            result["p95"], base["p95"], tolerance
+        ):
+            problems.append(
+                f"{name}: p50/p95 {result['p50']}/{result['p95']}ms > "
+                f"baseline {base['p50']}/{base['p95']}ms"
+            )
+    return problems
+
+
+# Параметры прогона, которые должны совпадать с эталоном
+RUN_PARAMETERS = ("requests", "concurrency", "warmup")
+
+
+def load_baseline(path: str, sizes: dict, args) -> dict:
+    """Эталон, записанный с теми же данными и параметрами прогона."""
+    try:
+        with open(path) as baseline_file:
+            baseline = json.load(baseline_file)
+    except FileNotFoundError:
+        sys.exit(
+            f"Baseline {path} not found; record one on this environment "
+            "with --save-baseline"
+        )
+    mismatched = [
+        name
+        for name in RUN_PARAMETERS
+        if baseline.get(name) != getattr(args, name)
+    ]
+    if baseline.get("sizes") != sizes:
+        mismatched.append("sizes")
+    if mismatched:
+        sys.exit(
+            f"Baseline {path} was recorded with different "
+            f"{', '.join(mismatched)}; re-record it with --save-baseline"
+        )
+    return baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument("--url", help="адрес запущенного сервера")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--only", nargs="*", help="имена сценариев")
+    parser.add_argument("--baseline", help="файл эталона для сравнения")
+    parser.add_argument("--save-baseline", help="куда записать результаты")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    sizes = {name: getattr(args, name) for name in DEFAULT_SIZES}
+    if args.baseline:
+        baseline = load_baseline(args.baseline, sizes, args)
+
+    print(
+        f"{'scenario':<22} {'requests':>7} {'rps':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    results = asyncio.run(run(args, sizes))
+
+    report = {
+        "sizes": sizes,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "scenarios": results,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(report, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+
+    if args.baseline:
+        problems = compare(results, baseline["scenarios"], args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+"""Сценарии нагрузки: по одному на каждый маршрут ``app/main.py``.
+
+Исключение — бесконечный поток ``GET /books/availability``: у него нет
+времени ответа, которое можно сравнить с эталоном.
+
+Сценарий описывает запрос через функцию ``build(ctx)``; необязательная
+``record(ctx, response)`` сохраняет созданные записи, которые используют
+следующие сценарии (обновление и удаление работают только с записями,
+созданными во время прогона, а не с засеянными данными). Порядок в
+``SCENARIOS`` важен: создание идёт раньше изменения и удаления.
+"""
+
+import random
+from collections import defaultdict
+from itertools import count
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from benchmarks.seed import PASSWORD, WORDS, popular_id, user_username
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    build: Callable
+    expected: Tuple[int, ...] = (200,)
+    # Тяжёлые маршруты (выгрузки, полные списки) запускаются реже
+    max_requests: Optional[int] = None
+    record: Optional[Callable] = None
+
+
+class Context:
+    def __init__(self, sizes: dict, seed: int, run_id: str):
+        self.sizes = sizes
+        self.rng = random.Random(seed)
+        self.run_id = run_id
+        self.admin = {}
+        self.user = {}
+        self.created = defaultdict(list)
+        self._sequence = count()
+
+    def unique(self, prefix: str) -> str:
+        return f"{prefix}-{self.run_id}-{next(self._sequence)}"
+
+    def any_id(self, table: str) -> int:
+        return self.rng.randint(1, self.sizes[table])
+
+    def sequential_id(self, table: str) -> int:
+        return next(self._sequence) % self.sizes[table] + 1
+
+    def book_id(self) -> int:
+        return popular_id(self.rng, self.sizes["books"])
+
+    def word(self) -> str:
+        return self.rng.choice(WORDS)
+
+    def take(self, kind: str):
+        return self.created[kind].pop()
+
+
+def _keep(kind: str):
+    def record(ctx: Context, response):
+        if response.status_code == 200:
+            ctx.created[kind].append(response.json()["id"])
+
+    return record
+
+
+def _author(ctx: Context) -> dict:
+    return {
+        "name": ctx.unique("Author"),
+        "biography": "Benchmark biography",
+        "birth_date": "1970-01-01",
+    }
+
+
+def _book(ctx: Context) -> dict:
+    return {
+        "title": ctx.unique("Book"),
+        "description": "Benchmark description",
+        "publication_date": "2000-01-01",
+        "available_copies": 5,
+        "author_id": ctx.any_id("authors"),
+    }
+
+
+def _csv(header: str, line: Callable, ctx: Context, rows: int = 100):
+    lines = [header] + [line(ctx) for _ in range(rows)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _import_authors(ctx: Context) -> dict:
+    body = _csv(
+        "name,biography,birth_date",
+        lambda ctx: f"{ctx.unique('Imported')},Imported,1970-01-01",
+        ctx,
+    )
+    return {
+        "url": "/authors/import",
+        "files": {"file": ("authors.csv", body, "text/csv")},
+        "headers": ctx.admin,
+    }
+
+
+def _import_books(ctx: Context) -> dict:
+    author_id = ctx.any_id("authors")
+    body = _csv(
+        "title,description,publication_date,available_copies,author_id",
+        lambda ctx: f"{ctx.unique('Imported')},Imported,2000-01-01,"
+        f"3,{author_id}",
+        ctx,
+    )
+    return {
+        "url": "/books/import",
+        "files": {"file": ("books.csv", body, "text/csv")},
+        "headers": ctx.admin,
+    }
+
+
+def _link_genre(ctx: Context) -> dict:
+    genre_id = ctx.created["genres"][-1]
+    # Каждой связи — своя книга, чтобы удаление не встретило дубль
+    book_id = ctx.sequential_id("books")
+    ctx.created["links"].append((book_id, genre_id))
+    return {"url": f"/books/{book_id}/genres/{genre_id}", "headers": ctx.admin}
+
+
+def _unlink_genre(ctx: Context) -> dict:
+    book_id, genre_id = ctx.take("links")
+    return {"url": f"/books/{book_id}/genres/{genre_id}", "headers": ctx.admin}
+
+
+def _keep_refresh_token(ctx: Context, response):
+    if response.status_code == 200:
+        ctx.created["refresh_tokens"].append(response.json()["refresh_token"])
+
+
+def _refresh(url: str):
+    # Каждый refresh-токен предъявляется один раз: повтор отзывает вход
+    def build(ctx: Context) -> dict:
+        return {
+            "url": url,
+            "json": {"refresh_token": ctx.take("refresh_tokens")},
+        }
+
+    return build
+
+
+def _ids(ctx: Context, table: str, count: int = 20) -> str:
+    return ",".join(str(ctx.any_id(table)) for _ in range(count))
+
+
+def _issue(ctx: Context) -> dict:
+    return {
+        "url": "/book_issues/",
+        "json": {
+            "user_id": ctx.any_id("users"),
+            "book_id": ctx.book_id(),
+            "issue_date": "2026-01-05",
+            "expected_return_date": "2026-01-19",
+        },
+        "headers": ctx.admin,
+    }
+
+
+SCENARIOS = [
+    # Пользователи и аутентификация
+    Scenario(
+        "token",
+        "POST",
+        lambda ctx: {
+            "url": "/token",
+            "data": {
+                "username": user_username(ctx.any_id("users")),
+                "password": PASSWORD,
+            },
+        },
+        record=_keep_refresh_token,
+    ),
+    Scenario(
+        "refresh_token",
+        "POST",
+        _refresh("/token/refresh"),
+        record=_keep_refresh_token,
+    ),
+    Scenario("revoke_token", "POST", _refresh("/token/revoke")),
+    Scenario(
+        "create_user",
+        "POST",
+        lambda ctx: {
+            "url": "/users/",
+            "json": {"username": ctx.unique("user"), "password": PASSWORD},
+        },
+    ),
+    # Для нового имени маршрут отвечает 404: get_user_by_username
+    # сообщает об отсутствии пользователя исключением
+    Scenario(
+        "create_admin_user",
+        "POST",
+        lambda ctx: {
+            "url": "/admin/users/",
+            "json": {"username": ctx.unique("admin"), "password": PASSWORD},
+        },
+        expected=(200, 404),
+    ),
+    Scenario(
+        "read_me",
+        "GET",
+        lambda ctx: {"url": "/users/me/", "headers": ctx.user},
+    ),
+    Scenario(
+        "update_me",
+        "PUT",
+        lambda ctx: {"url": "/users/me/", "json": {}, "headers": ctx.user},
+    ),
+    Scenario(
+        "list_users",
+        "GET",
+        lambda ctx: {"url": "/users/", "headers": ctx.admin},
+        max_requests=20,
+    ),
+    # Служебные маршруты
+    Scenario("healthz", "GET", lambda ctx: {"url": "/healthz"}),
+    # В процессе (без --url) lifespan не запускается, и /readyz
+    # отвечает 503
+    Scenario(
+        "readyz", "GET", lambda ctx: {"url": "/readyz"}, expected=(200, 503)
+    ),
+    Scenario("metrics", "GET", lambda ctx: {"url": "/metrics"}),
+    Scenario(
+        "pool_status",
+        "GET",
+        lambda ctx: {"url": "/admin/db/pool", "headers": ctx.admin},
+    ),
+    Scenario(
+        "hasher_status",
+        "GET",
+        lambda ctx: {"url": "/admin/hasher", "headers": ctx.admin},
+    ),
+    Scenario(
+        "stats_user",
+        "GET",
+        lambda ctx: {
+            "url": f"/admin/stats/users/{ctx.any_id('users')}",
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "stats_overdue",
+        "GET",
+        lambda ctx: {
+            "url": "/admin/stats/overdue",
+            "params": {"as_of": "2026-01-01"},
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "stats_top_books",
+        "GET",
+        lambda ctx: {
+            "url": "/admin/stats/top-books",
+            "params": {"week": "2025-12-01"},
+            "headers": ctx.admin,
+        },
+    ),
+    # Авторы
+    Scenario(
+        "create_author",
+        "POST",
+        lambda ctx: {
+            "url": "/authors/",
+            "json": _author(ctx),
+            "headers": ctx.admin,
+        },
+        record=_keep("authors"),
+    ),
+    Scenario(
+        "read_author",
+        "GET",
+        lambda ctx: {"url": f"/authors/{ctx.any_id('authors')}"},
+    ),
+    Scenario(
+        "update_author",
+        "PUT",
+        lambda ctx: {
+            "url": f"/authors/{ctx.created['authors'][-1]}",
+            "json": _author(ctx),
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "list_authors",
+        "GET",
+        lambda ctx: {"url": "/authors/", "params": {"limit": 50}},
+    ),
+    Scenario(
+        "list_authors_fields",
+        "GET",
+        lambda ctx: {
+            "url": "/authors/",
+            "params": {"limit": 50, "fields": "name"},
+        },
+    ),
+    Scenario(
+        "batch_authors",
+        "GET",
+        lambda ctx: {
+            "url": "/authors/",
+            "params": {"ids": _ids(ctx, "authors")},
+        },
+    ),
+    Scenario(
+        "search_authors",
+        "GET",
+        lambda ctx: {"url": "/authors/", "params": {"search": ctx.word()}},
+    ),
+    Scenario(
+        "export_authors",
+        "GET",
+        lambda ctx: {"url": "/authors/export", "headers": ctx.admin},
+        max_requests=5,
+    ),
+    Scenario("import_authors", "POST", _import_authors, max_requests=20),
+    # Жанры
+    Scenario(
+        "create_genre",
+        "POST",
+        lambda ctx: {
+            "url": "/genres/",
+            "json": {"name": ctx.unique("Genre")},
+            "headers": ctx.admin,
+        },
+        record=_keep("genres"),
+    ),
+    Scenario("list_genres", "GET", lambda ctx: {"url": "/genres/"}),
+    Scenario("genre_facets", "GET", lambda ctx: {"url": "/genres/facets"}),
+    Scenario(
+        "genre_facets_search",
+        "GET",
+        lambda ctx: {
+            "url": "/genres/facets",
+            "params": {"search": ctx.word()},
+        },
+    ),
+    Scenario(
+        "read_genre",
+        "GET",
+        lambda ctx: {"url": f"/genres/{ctx.any_id('genres')}"},
+    ),
+    Scenario(
+        "update_genre",
+        "PUT",
+        lambda ctx: {
+            "url": f"/genres/{ctx.created['genres'][-1]}",
+            "json": {"name": ctx.unique("Genre")},
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario("add_book_genre", "PUT", _link_genre),
+    Scenario("remove_book_genre", "DELETE", _unlink_genre),
+    # Книги
+    Scenario(
+        "create_book",
+        "POST",
+        lambda ctx: {
+            "url": "/books/",
+            "json": _book(ctx),
+            "headers": ctx.admin,
+        },
+        record=_keep("books"),
+    ),
+    Scenario(
+        "read_book", "GET", lambda ctx: {"url": f"/books/{ctx.book_id()}"}
+    ),
+    Scenario(
+        "read_book_include",
+        "GET",
+        lambda ctx: {
+            "url": f"/books/{ctx.book_id()}",
+            "params": {"include": "author,genres"},
+        },
+    ),
+    Scenario(
+        "read_book_fields",
+        "GET",
+        lambda ctx: {
+            "url": f"/books/{ctx.book_id()}",
+            "params": {"fields": "title,available_copies"},
+        },
+    ),
+    Scenario(
+        "update_book",
+        "PUT",
+        lambda ctx: {
+            "url": f"/books/{ctx.created['books'][-1]}",
+            "json": _book(ctx),
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "list_books",
+        "GET",
+        lambda ctx: {"url": "/books/", "params": {"limit": 50}},
+    ),
+    Scenario(
+        "list_books_include",
+        "GET",
+        lambda ctx: {
+            "url": "/books/",
+            "params": {"limit": 50, "include": "author,genres"},
+        },
+    ),
+    Scenario(
+        "list_books_genre",
+        "GET",
+        lambda ctx: {
+            "url": "/books/",
+            "params": {"limit": 50, "genre": ctx.any_id("genres")},
+        },
+    ),
+    Scenario(
+        "list_books_fields",
+        "GET",
+        lambda ctx: {
+            "url": "/books/",
+            "params": {"limit": 50, "fields": "title,available_copies"},
+        },
+    ),
+    Scenario(
+        "batch_books",
+        "GET",
+        lambda ctx: {"url": "/books/", "params": {"ids": _ids(ctx, "books")}},
+    ),
+    Scenario(
+        "search_books",
+        "GET",
+        lambda ctx: {"url": "/books/", "params": {"search": ctx.word()}},
+    ),
+    Scenario(
+        "export_books",
+        "GET",
+        lambda ctx: {"url": "/books/export", "headers": ctx.admin},
+        max_requests=5,
+    ),
+    Scenario("import_books", "POST", _import_books, max_requests=20),
+    # Выдачи; популярные книги быстро заканчиваются, отсюда 409
+    Scenario(
+        "checkout",
+        "POST",
+        _issue,
+        expected=(200, 409),
+        record=_keep("issues"),
+    ),
+    Scenario(
+        "return_book",
+        "PUT",
+        lambda ctx: {
+            "url": f"/book_issues/{ctx.take('issues')}",
+            "json": {"return_date": "2026-01-12"},
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "list_issues",
+        "GET",
+        lambda ctx: {"url": "/book_issues/", "headers": ctx.user},
+    ),
+    Scenario(
+        "export_issues",
+        "GET",
+        lambda ctx: {"url": "/book_issues/export", "headers": ctx.admin},
+        max_requests=5,
+    ),
+    # Удаление созданных в прогоне записей
+    Scenario(
+        "delete_book",
+        "DELETE",
+        lambda ctx: {
+            "url": f"/books/{ctx.take('books')}",
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "delete_genre",
+        "DELETE",
+        lambda ctx: {
+            "url": f"/genres/{ctx.take('genres')}",
+            "headers": ctx.admin,
+        },
+    ),
+    Scenario(
+        "delete_author",
+        "DELETE",
+        lambda ctx: {
+            "url": f"/authors/{ctx.take('authors')}",
+            "headers": ctx.admin,
+        },
+    ),
+]
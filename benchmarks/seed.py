@@ -0,0 +1,330 @@
+"""Генератор синтетической библиотеки для нагрузочных тестов.
+
+Схема в базе ``--database-url`` удаляется и создаётся заново, поэтому
+генератор требует явного ``--drop-existing`` и отказывается работать с
+базой приложения по умолчанию (``config.DEFAULT_DATABASE_URL``)::
+
+    python -m benchmarks.seed \\
+        --database-url postgresql+psycopg2://.../libra_bench \\
+        --drop-existing --books 1000000 --users 100000 --issues 10000000
+
+Строки вставляются порциями (COPY на PostgreSQL, executemany на
+остальных СУБД) с явными ``id``, чтобы
+сценарии могли выбирать существующие записи без запросов к базе.
+Данные детерминированы параметром ``--seed``.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from itertools import islice
+
+from sqlalchemy import Date, case, func, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# search регистрирует DDL полнотекстовых индексов для create_all
+from app import config, models, search  # noqa: F401
+from app.database import Base
+from app.hashing import pwd_context
+
+logger = logging.getLogger(__name__)
+
+ADMIN_USERNAME = "benchadmin"
+PASSWORD = "benchmark"
+
+DEFAULT_SIZES = {
+    "authors": 1000,
+    "books": 10000,
+    "genres": 50,
+    "users": 1000,
+    "issues": 100000,
+}
+
+# Выдачи распределены по двум последним годам до этой даты
+HISTORY_END = date(2026, 1, 1)
+HISTORY_DAYS = 730
+LOAN_DAYS = 14
+
+WORDS = (
+    "war peace night river garden winter letters house city stone "
+    "light shadow voyage island empire secret silver mountain sea time"
+).split()
+
+
+def add_size_arguments(parser: argparse.ArgumentParser):
+    for name, default in DEFAULT_SIZES.items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def user_username(user_id: int) -> str:
+    return ADMIN_USERNAME if user_id == 1 else f"user{user_id}"
+
+
+def popular_id(rng: random.Random, count: int) -> int:
+    # Квадрат равномерной величины смещает выбор к малым id:
+    # небольшая часть книг получает большую часть выдач
+    return int(count * rng.random() ** 2) + 1
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _users(sizes, rng):
+    hashed_password = pwd_context.hash(PASSWORD)
+    for user_id in range(1, sizes["users"] + 1):
+        yield {
+            "id": user_id,
+            "username": user_username(user_id),
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_admin": user_id == 1,
+        }
+
+
+def _authors(sizes, rng):
+    for author_id in range(1, sizes["authors"] + 1):
+        yield {
+            "id": author_id,
+            "name": f"{_words(rng, 2).title()} {author_id}",
+            "biography": _words(rng, 20),
+            "birth_date": date(1800, 1, 1)
+            + timedelta(days=rng.randrange(70000)),
+        }
+
+
+def _genres(sizes, rng):
+    for genre_id in range(1, sizes["genres"] + 1):
+        yield {"id": genre_id, "name": f"Genre {genre_id}"}
+
+
+def _books(sizes, rng):
+    for book_id in range(1, sizes["books"] + 1):
+        yield {
+            "id": book_id,
+            "title": f"{_words(rng, 3).capitalize()} {book_id}",
+            "description": _words(rng, 30),
+            "publication_date": date(1900, 1, 1)
+            + timedelta(days=rng.randrange(45000)),
+            "available_copies": rng.randint(1, 20),
+            "author_id": popular_id(rng, sizes["authors"]),
+        }
+
+
+def _book_genres(sizes, rng):
+    for book_id in range(1, sizes["books"] + 1):
+        for genre_id in rng.sample(
+            range(1, sizes["genres"] + 1), min(2, sizes["genres"])
+        ):
+            yield {"book_id": book_id, "genre_id": genre_id}
+
+
+def _issues(sizes, rng):
+    for issue_id in range(1, sizes["issues"] + 1):
+        issue_date = HISTORY_END - timedelta(days=rng.randrange(HISTORY_DAYS))
+        expected = issue_date + timedelta(days=LOAN_DAYS)
+        returned = None
+        # Около 5% книг не возвращены
+        if rng.random() >= 0.05:
+            returned = issue_date + timedelta(days=rng.randint(1, 30))
+        yield {
+            "id": issue_id,
+            "user_id": rng.randint(1, sizes["users"]),
+            "book_id": popular_id(rng, sizes["books"]),
+            "issue_date": issue_date,
+            "return_date": returned,
+            "expected_return_date": expected,
+        }
+
+
+TABLES = (
+    (models.User, _users),
+    (models.Author, _authors),
+    (models.Genre, _genres),
+    (models.Book, _books),
+    (models.book_genres, _book_genres),
+    (models.BookIssue, _issues),
+)
+
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """DSN для асинхронного движка: драйвер заменяется на asyncpg/aiosqlite."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise SystemExit(f"Unsupported database: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def _target(url: str) -> tuple:
+    parsed = make_url(url)
+    return (
+        parsed.get_backend_name(),
+        parsed.host,
+        parsed.port,
+        parsed.database,
+    )
+
+
+def check_target(url: str, drop_existing: bool):
+    """Отказ, если схему можно удалить по ошибке."""
+    if _target(url) == _target(config.DEFAULT_DATABASE_URL):
+        raise SystemExit(
+            "Refusing to seed the application's default database; "
+            "pass a separate --database-url"
+        )
+    if not drop_existing:
+        raise SystemExit(
+            "Seeding drops every table in the target database; "
+            "pass --drop-existing to confirm"
+        )
+
+
+async def _copy_batch(db, model, batch: list):
+    table = getattr(model, "__table__", model)
+    if db.get_bind().dialect.name != "postgresql":
+        await db.execute(insert(table), batch)
+        return
+    columns = list(batch[0].keys())
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=[tuple(row[column] for column in columns) for row in batch],
+        columns=columns,
+    )
+
+
+async def _insert_rows(session_factory, model, rows, batch_size: int) -> int:
+    total = 0
+    async with session_factory() as db:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return total
+            await _copy_batch(db, model, batch)
+            await db.commit()
+            total += len(batch)
+
+
+def _week_start(dialect: str, column):
+    if dialect == "postgresql":
+        return func.date_trunc("week", column).cast(Date)
+    return func.date(column, "-6 days", "weekday 1")
+
+
+async def _rebuild_summaries(engine):
+    """Пересчитывает счётчики, которые приложение ведёт инкрементально."""
+    issues = models.BookIssue
+    open_loan = func.sum(case((issues.return_date.is_(None), 1), else_=0))
+    week = _week_start(engine.dialect.name, issues.issue_date)
+    statements = [
+        insert(models.GenreBookCount).from_select(
+            ["genre_id", "book_count"],
+            select(models.book_genres.c.genre_id, func.count()).group_by(
+                models.book_genres.c.genre_id
+            ),
+        ),
+        insert(models.UserLoanStats).from_select(
+            ["user_id", "open_loans", "total_loans"],
+            select(issues.user_id, open_loan, func.count()).group_by(
+                issues.user_id
+            ),
+        ),
+        insert(models.LoanDueCount).from_select(
+            ["due_date", "open_loans"],
+            select(issues.expected_return_date, func.count())
+            .filter(issues.return_date.is_(None))
+            .group_by(issues.expected_return_date),
+        ),
+        insert(models.BookWeeklyBorrows).from_select(
+            ["week_start", "book_id", "borrow_count"],
+            select(week, issues.book_id, func.count()).group_by(
+                week, issues.book_id
+            ),
+        ),
+    ]
+    async with engine.begin() as connection:
+        for statement in statements:
+            await connection.execute(statement)
+
+
+async def _reset_sequences(engine):
+    # Явные id не сдвигают последовательности PostgreSQL
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as connection:
+        for model in (
+            models.User,
+            models.Author,
+            models.Genre,
+            models.Book,
+            models.BookIssue,
+        ):
+            tablename = model.__tablename__
+            await connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{tablename}', "
+                    f"'id'), coalesce(max(id), 1)) FROM {tablename}"
+                )
+            )
+
+
+async def seed(
+    database_url: str, sizes: dict, batch_size: int = 10000, seed: int = 0
+):
+    engine = create_async_engine(async_url(database_url))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(seed)
+    for model, generate in TABLES:
+        start = time.perf_counter()
+        inserted = await _insert_rows(
+            session_factory, model, generate(sizes, rng), batch_size
+        )
+        name = getattr(model, "__tablename__", None) or model.name
+        logger.info(
+            f"Seeded {inserted} {name} in {time.perf_counter() - start:.1f}s"
+        )
+    await _rebuild_summaries(engine)
+    await _reset_sequences(engine)
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", required=True, help="DSN отдельной базы для прогона"
+    )
+    parser.add_argument(
+        "--drop-existing",
+        action="store_true",
+        help="подтверждение: все таблицы базы будут удалены",
+    )
+    add_size_arguments(parser)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    check_target(args.database_url, args.drop_existing)
+    logging.basicConfig(level=logging.INFO)
+    sizes = {name: getattr(args, name) for name in DEFAULT_SIZES}
+    asyncio.run(seed(args.database_url, sizes, args.batch_size, args.seed))
+
+
+if __name__ == "__main__":
+    main()
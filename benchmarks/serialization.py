@@ -0,0 +1,107 @@
+"""Сравнение сериализации страницы книг: прежний путь и быстрый.
+
+Прежний путь: ORM-объекты, проверка каждой строки ``BookResponse``,
+``jsonable_encoder`` и стандартный ``json`` — то, что делал FastAPI для
+``response_model``. Быстрый путь: ``select()`` колонок и orjson, как в
+``app.responses``. База — временный файл SQLite, запуск::
+
+    python -m benchmarks.serialization --rows 500 --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import models, schemas
+from app.database import Base
+from app.responses import ORJSONResponse, columns_for
+
+
+async def _orm_pydantic_json(db, rows: int) -> bytes:
+    books = (await db.scalars(select(models.Book).limit(rows))).all()
+    validated = [
+        schemas.BookResponse.model_validate(book, from_attributes=True)
+        for book in books
+    ]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+async def _columns_orjson(db, rows: int) -> bytes:
+    query = select(*columns_for(models.Book, schemas.BookResponse))
+    result = await db.execute(query.limit(rows))
+    return ORJSONResponse([row._asdict() for row in result.all()]).body
+
+
+async def _measure(session_factory, render, rows: int, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            await render(db, rows)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+async def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_async_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.execute(
+                insert(models.Author),
+                [{"id": 1, "name": "Author", "birth_date": date(1900, 1, 1)}],
+            )
+            await connection.execute(
+                insert(models.Book),
+                [
+                    {
+                        "title": f"Book {index}",
+                        "description": "Description " * 20,
+                        "publication_date": date(2000, 1, 1),
+                        "available_copies": 3,
+                        "author_id": 1,
+                    }
+                    for index in range(rows)
+                ],
+            )
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        paths = (
+            ("orm + pydantic + json", _orm_pydantic_json),
+            ("columns + orjson", _columns_orjson),
+        )
+        # Оба пути должны давать один и тот же документ
+        bodies = [
+            json.loads(await _render_once(session_factory, render, rows))
+            for _, render in paths
+        ]
+        assert bodies[0] == bodies[1]
+        print(f"{rows} rows, median/max of {repeat} runs")
+        for name, render in paths:
+            median, worst = await _measure(
+                session_factory, render, rows, repeat
+            )
+            print(f"{name:<24} {median:8.2f} ms {worst:8.2f} ms")
+        await engine.dispose()
+
+
+async def _render_once(session_factory, render, rows: int) -> bytes:
+    async with session_factory() as db:
+        return await render(db, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
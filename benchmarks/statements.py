@@ -0,0 +1,223 @@
+"""Число SQL-команд на каждый пишущий маршрут.
+
+Приложение вызывается в том же процессе через ``httpx.ASGITransport``
+и работает с временной базой SQLite. Пользователь аутентифицируется
+заранее, поэтому в счёт попадают только команды самой записи (BEGIN и
+COMMIT драйвер выполняет без курсора и не считаются)::
+
+    python -m benchmarks.statements
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# search регистрирует DDL полнотекстовых индексов для create_all
+from app import search  # noqa: F401
+from app.cache import principal_cache
+from app.database import Base, get_db
+from app.main import app
+
+PASSWORD = "benchmark"
+
+AUTHOR = {
+    "name": "Author",
+    "biography": "Biography",
+    "birth_date": "1900-01-01",
+}
+
+
+def book(author_id: int) -> dict:
+    return {
+        "title": "Book",
+        "description": "Description",
+        "publication_date": "2000-01-01",
+        "available_copies": 5,
+        "author_id": author_id,
+    }
+
+
+def issue(user_id: int, book_id: int) -> dict:
+    return {
+        "user_id": user_id,
+        "book_id": book_id,
+        "issue_date": "2026-01-05",
+        "expected_return_date": "2026-01-19",
+    }
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def _measure(client, counter, method, url, **options):
+    before = counter.count
+    response = await client.request(method, url, **options)
+    response.raise_for_status()
+    return response, counter.count - before
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_async_engine(url, poolclass=NullPool)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_db():
+            async with session_factory() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        principal_cache.clear()
+        counter = StatementCounter(engine)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            results = []
+
+            async def measure(name, method, url, **options):
+                response, count = await _measure(
+                    client, counter, method, url, **options
+                )
+                results.append((name, count))
+                return response
+
+            user = await measure(
+                "POST /users/",
+                "POST",
+                "/users/",
+                json={
+                    "username": "bench",
+                    "password": PASSWORD,
+                    "is_admin": True,
+                },
+            )
+            token = await client.post(
+                "/token", data={"username": "bench", "password": PASSWORD}
+            )
+            headers = {
+                "Authorization": f"Bearer {token.json()['access_token']}"
+            }
+            # Пользователь попадает в кэш и больше не читается из базы
+            await client.get("/users/me/", headers=headers)
+            user_id = user.json()["id"]
+
+            author = await measure(
+                "POST /authors/",
+                "POST",
+                "/authors/",
+                json=AUTHOR,
+                headers=headers,
+            )
+            author_id = author.json()["id"]
+            await measure(
+                "PUT /authors/{author_id}",
+                "PUT",
+                f"/authors/{author_id}",
+                json=dict(AUTHOR, name="Renamed"),
+                headers=headers,
+            )
+            created = await measure(
+                "POST /books/",
+                "POST",
+                "/books/",
+                json=book(author_id),
+                headers=headers,
+            )
+            book_id = created.json()["id"]
+            await measure(
+                "PUT /books/{book_id}",
+                "PUT",
+                f"/books/{book_id}",
+                json=dict(book(author_id), title="Renamed"),
+                headers=headers,
+            )
+            genre = await measure(
+                "POST /genres/",
+                "POST",
+                "/genres/",
+                json={"name": "Genre"},
+                headers=headers,
+            )
+            genre_id = genre.json()["id"]
+            await measure(
+                "PUT /genres/{genre_id}",
+                "PUT",
+                f"/genres/{genre_id}",
+                json={"name": "Renamed"},
+                headers=headers,
+            )
+            created_issue = await measure(
+                "POST /book_issues/",
+                "POST",
+                "/book_issues/",
+                json=issue(user_id, book_id),
+                headers=headers,
+            )
+            await measure(
+                "PUT /book_issues/{book_issue_id}",
+                "PUT",
+                f"/book_issues/{created_issue.json()['id']}",
+                json={"return_date": "2026-01-10"},
+                headers=headers,
+            )
+            await measure(
+                "DELETE /genres/{genre_id}",
+                "DELETE",
+                f"/genres/{genre_id}",
+                headers=headers,
+            )
+            spare = await client.post(
+                "/books/", json=book(author_id), headers=headers
+            )
+            await measure(
+                "DELETE /books/{book_id}",
+                "DELETE",
+                f"/books/{spare.json()['id']}",
+                headers=headers,
+            )
+            spare = await client.post(
+                "/authors/", json=AUTHOR, headers=headers
+            )
+            await measure(
+                "DELETE /authors/{author_id}",
+                "DELETE",
+                f"/authors/{spare.json()['id']}",
+                headers=headers,
+            )
+            # Смена имени сбрасывает кэш пользователя, поэтому последней
+            await measure(
+                "PUT /users/me/",
+                "PUT",
+                "/users/me/",
+                json={"username": "bench"},
+                headers=headers,
+            )
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+
+    print(f"{'route':<36} statements")
+    for name, count in results:
+        print(f"{name:<36} {count:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+    asyncio.run(main())
@@ -1,34 +1,52 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
+import os
 import sys
 from os.path import abspath, dirname
 
 sys.path.insert(0, dirname(dirname(abspath(__file__))))
 
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+
+# Запуск приложения (lifespan) в фикстуре client идёт к тестовой базе, а
+# не к DATABASE_URL из окружения
+os.environ["DATABASE_URL"] = SQLALCHEMY_DATABASE_URL
+os.environ["ASYNC_DATABASE_URL"] = ASYNC_SQLALCHEMY_DATABASE_URL
+# Минимальная стоимость bcrypt, чтобы тесты не тратили время на хеширование
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Повторяющиеся SELECT в одном запросе (N+1) роняют тест
+os.environ.setdefault("DIAGNOSTICS_ENABLED", "1")
+os.environ.setdefault("N_PLUS_ONE_RAISE", "1")
+
+from app import context
 from app.database import Base, get_db
 from app.main import app
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
-TestingSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
+
+# TestClient без lifespan запускает каждый запрос в собственном цикле
+# событий, поэтому соединения aiosqlite нельзя переиспользовать
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool
+)
+TestingSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
 )
 
+Base.metadata.drop_all(bind=engine)
 Base.metadata.create_all(bind=engine)
 
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+async def override_get_db():
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
@@ -38,3 +56,96 @@ app.dependency_overrides[get_db] = override_get_db
 def client():
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(scope="module")
+def make_admin_headers(client):
+    """Создаёт администратора и возвращает заголовок с его токеном."""
+
+    def make(username: str, password: str = "testpassword") -> dict:
+        client.post(
+            "/users/",
+            json={
+                "username": username,
+                "password": password,
+                "is_admin": True,
+            },
+        )
+        response = client.post(
+            "/token", data={"username": username, "password": password}
+        )
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def make_author(client):
+    """Создаёт автора и возвращает его в виде ответа API."""
+
+    def make(headers: dict, **fields) -> dict:
+        author_data = {
+            "name": "Test Author",
+            "biography": "Biography",
+            "birth_date": "1950-01-01",
+            **fields,
+        }
+        response = client.post("/authors/", json=author_data, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    return make
+
+
+@pytest.fixture(scope="module")
+def make_book(client, make_author):
+    """Создаёт книгу (и автора, если author_id не передан)."""
+
+    def make(headers: dict, **fields) -> dict:
+        if "author_id" not in fields:
+            fields["author_id"] = make_author(headers)["id"]
+        book_data = {
+            "title": "Test Book",
+            "description": "Description",
+            "publication_date": "2000-01-01",
+            "available_copies": 1,
+            **fields,
+        }
+        response = client.post("/books/", json=book_data, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    return make
+
+
+class CapturedStatements(list):
+    """Выполненные SQL-команды: пары (statement, parameters)."""
+
+    def selects(self) -> list:
+        return [
+            statement
+            for statement, _ in self
+            if statement.lstrip().upper().startswith("SELECT")
+        ]
+
+    def heads(self, words: int = 2) -> list:
+        # Вид команды без подробностей: "INSERT INTO", "UPDATE BOOKS"
+        return [
+            " ".join(statement.split()[:words]).upper()
+            for statement, _ in self
+        ]
+
+
+@pytest.fixture
+def statements():
+    """Перехватывает SQL-команды, выполненные в HTTP-запросах."""
+    captured = CapturedStatements()
+
+    def capture(request, statement, parameters, executemany, elapsed):
+        # Подготовка данных в самом тесте идёт вне запроса и не попадает
+        if request is not None:
+            captured.append((statement, parameters))
+
+    context.on_statement(capture)
+    yield captured
+    context._statement_listeners.remove(capture)
@@ -0,0 +1,133 @@
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import update
+
+from app import crud, models
+from app.cache import TTLCache, principal_cache
+from app.hashing import password_hasher
+from tests.conftest import engine
+
+
+def login(client, username, password="testpassword"):
+    response = client.post(
+        "/token", data={"username": username, "password": password}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    original = crud.get_user_by_username
+
+    async def counting_lookup(db, username):
+        calls.append(username)
+        return await original(db, username)
+
+    monkeypatch.setattr(crud, "get_user_by_username", counting_lookup)
+    return calls
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    now = [0.0]
+    cache = TTLCache(maxsize=10, ttl=5, timer=lambda: now[0])
+    cache.set("a", 1)
+    now[0] = 4.9
+    assert cache.get("a") == 1
+    now[0] = 5.0
+    assert cache.get("a") is None
+
+
+def test_principal_is_cached_between_requests(client, lookups):
+    client.post(
+        "/users/", json={"username": "cached", "password": "testpassword"}
+    )
+    headers = login(client, "cached")
+    principal_cache.clear()
+    lookups.clear()
+
+    for _ in range(3):
+        response = client.get("/users/me/", headers=headers)
+        assert response.status_code == 200
+    assert lookups == ["cached"]
+
+
+def test_admin_route_resolves_principal_once(
+    client, make_admin_headers, lookups
+):
+    headers = make_admin_headers("cachedadmin")
+    principal_cache.clear()
+    lookups.clear()
+
+    response = client.get("/users/", headers=headers)
+    assert response.status_code == 200
+    assert lookups == ["cachedadmin"]
+
+
+def test_update_user_invalidates_principal(client):
+    client.post(
+        "/users/", json={"username": "renamed", "password": "testpassword"}
+    )
+    headers = login(client, "renamed")
+    assert client.get("/users/me/", headers=headers).status_code == 200
+
+    response = client.put(
+        "/users/me/", json={"username": "renamed2"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert principal_cache.get("renamed") is None
+
+    # Токен со старым subject больше не указывает на пользователя
+    response = client.get("/users/me/", headers=headers)
+    assert response.status_code != 200
+    response = client.get("/users/me/", headers=login(client, "renamed2"))
+    assert response.json()["username"] == "renamed2"
+
+
+def test_login_rehashes_password_when_cost_changes(client):
+    client.post(
+        "/users/", json={"username": "rehashed", "password": "testpassword"}
+    )
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash(
+        "testpassword"
+    )
+    with engine.begin() as connection:
+        connection.execute(
+            update(models.User)
+            .where(models.User.username == "rehashed")
+            .values(hashed_password=old_hash)
+        )
+
+    assert client.get(
+        "/users/me/", headers=login(client, "rehashed")
+    ).is_success
+    with engine.connect() as connection:
+        new_hash = connection.scalar(
+            models.User.__table__.select()
+            .with_only_columns(models.User.hashed_password)
+            .where(models.User.username == "rehashed")
+        )
+    assert new_hash.startswith("$2b$04$")
+
+
+def test_login_is_rejected_when_hasher_is_saturated(client, monkeypatch):
+    client.post(
+        "/users/", json={"username": "saturated", "password": "testpassword"}
+    )
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post(
+        "/token", data={"username": "saturated", "password": "testpassword"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("batchadmin")
+
+
+@pytest.fixture(scope="module")
+def books(admin_headers, make_author, make_book):
+    author_id = make_author(admin_headers, name="Batch Author")["id"]
+    return [
+        make_book(
+            admin_headers, author_id=author_id, title=f"Batch Book {number}"
+        )
+        for number in range(3)
+    ]
+
+
+def ids_param(*ids):
+    return {"ids": ",".join(str(item) for item in ids)}
+
+
+def test_batch_returns_books_in_order_with_one_query(
+    client, books, statements
+):
+    first, second, third = books
+    response = client.get(
+        "/books/",
+        params=ids_param(third["id"], 999999, first["id"], third["id"]),
+    )
+    assert response.status_code == 200
+    assert response.json() == [third, first]
+    assert response.headers["X-Missing-Ids"] == "999999"
+    assert len(statements.selects()) == 1
+    assert " IN " in statements.selects()[0]
+
+
+def test_batch_reuses_detail_cache(client, admin_headers, books, statements):
+    first, second, _ = books
+    # Карточка первой книги попадает в кэш через детальный маршрут
+    assert client.get(f"/books/{first['id']}").json() == first
+    statements.clear()
+
+    response = client.get("/books/", params=ids_param(first["id"]))
+    assert response.json() == [first]
+    assert "X-Missing-Ids" not in response.headers
+    assert statements.selects() == []
+
+    # Изменение книги сбрасывает кэш, и следующий пакет её перечитает
+    updated = dict(second, title="Batch Book Renamed")
+    del updated["id"]
+    client.put(f"/books/{second['id']}", json=updated, headers=admin_headers)
+    statements.clear()
+    response = client.get(
+        "/books/", params=ids_param(first["id"], second["id"])
+    )
+    assert [book["title"] for book in response.json()] == [
+        first["title"],
+        "Batch Book Renamed",
+    ]
+    assert len(statements.selects()) == 1
+
+
+def test_batch_authors(client, books):
+    author_id = books[0]["author_id"]
+    response = client.get("/authors/", params=ids_param(author_id, 888888))
+    assert response.status_code == 200
+    assert [author["id"] for author in response.json()] == [author_id]
+    assert response.headers["X-Missing-Ids"] == "888888"
+
+
+def test_batch_validation(client, books):
+    assert client.get("/books/", params={"ids": "1,abc"}).status_code == 400
+    assert client.get("/books/", params={"ids": ""}).status_code == 400
+    too_many = ids_param(*range(1, 102))
+    assert client.get("/books/", params=too_many).status_code == 400
+    response = client.get(
+        "/books/", params={"ids": str(books[0]["id"]), "include": "author"}
+    )
+    assert response.status_code == 400
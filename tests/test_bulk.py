@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from app import config
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("importadmin")
+
+
+@pytest.fixture(scope="module")
+def author_id(admin_headers, make_author):
+    return make_author(admin_headers, name="Imported Books Author")["id"]
+
+
+def test_import_authors_csv_reports_invalid_rows(
+    client, admin_headers, monkeypatch
+):
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    content = (
+        "name,biography,birth_date\n"
+        "Imported One,Bio,1901-01-01\n"
+        "Imported Two,Bio,not-a-date\n"
+        "Imported Three,\"Multi\nline\",1903-01-01\n"
+        "Imported Four,Bio,1904-01-01\n"
+    )
+    response = client.post(
+        "/authors/import",
+        files={"file": ("authors.csv", content, "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 3
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 3
+    assert report["errors_truncated"] is False
+
+    response = client.get("/authors/", params={"search": "Imported"})
+    assert {author["name"] for author in response.json()} >= {
+        "Imported One",
+        "Imported Three",
+        "Imported Four",
+    }
+
+
+def test_import_books_ndjson(client, admin_headers, author_id):
+    book = {
+        "title": "Imported Book",
+        "description": "Description",
+        "publication_date": "2001-01-01",
+        "available_copies": 2,
+        "author_id": author_id,
+    }
+    lines = [
+        json.dumps({**book, "title": f"Imported Book {n}"}) for n in range(5)
+    ]
+    lines.insert(2, "{broken")
+    lines.insert(4, "")
+    content = "\n".join(lines) + "\n"
+    response = client.post(
+        "/books/import",
+        files={"file": ("books.ndjson", content, "application/x-ndjson")},
+        headers=admin_headers,
+    )
+    report = response.json()
+    assert report["inserted"] == 5
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 3
+
+
+def test_import_caps_reported_errors(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(config, "IMPORT_MAX_REPORTED_ERRORS", 2)
+    content = "\n".join(["{}"] * 5)
+    response = client.post(
+        "/books/import",
+        params={"format": "ndjson"},
+        files={"file": ("books.txt", content, "text/plain")},
+        headers=admin_headers,
+    )
+    report = response.json()
+    assert report["failed"] == 5
+    assert len(report["errors"]) == 2
+    assert report["errors_truncated"] is True
+
+
+def test_import_requires_known_format(client, admin_headers):
+    response = client.post(
+        "/books/import",
+        files={"file": ("books.txt", "", "text/plain")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
+
+
+def test_import_requires_admin(client):
+    response = client.post(
+        "/books/import", files={"file": ("books.csv", "", "text/csv")}
+    )
+    assert response.status_code == 401
+
+
+def test_import_reports_non_utf8_file(client, admin_headers):
+    content = (
+        "name,biography,birth_date\n"
+        "Encoded One,Bio,1901-01-01\n"
+        "José,Bio,1902-01-01\n"
+        "Encoded Three,Bio,1903-01-01\n"
+    )
+    response = client.post(
+        "/authors/import",
+        files={"file": ("authors.csv", content.encode("latin-1"), "text/csv")},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["errors"] == [
+        {"row": 3, "error": "File must be UTF-8 encoded"}
+    ]
@@ -0,0 +1,89 @@
+import pytest
+
+from app import crud
+from app.cache import CacheBackend
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("cacheadmin")
+
+
+@pytest.fixture(scope="module")
+def author_id(admin_headers, make_author):
+    return make_author(admin_headers, name="Cached Author")["id"]
+
+
+@pytest.fixture
+def book(admin_headers, author_id, make_book):
+    return make_book(
+        admin_headers,
+        author_id=author_id,
+        title="Cached Book",
+        available_copies=3,
+    )
+
+
+def test_book_detail_is_served_from_cache(client, book, monkeypatch):
+    book_id = book["id"]
+    first = client.get(f"/books/{book_id}")
+    assert first.status_code == 200
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(crud, "get_book", fail)
+    second = client.get(f"/books/{book_id}")
+    assert second.json() == first.json() == book
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_if_none_match_returns_not_modified(client, admin_headers, author_id):
+    response = client.get(f"/authors/{author_id}")
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        f"/authors/{author_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    response = client.get(
+        f"/authors/{author_id}", headers={"If-None-Match": '"stale"'}
+    )
+    assert response.status_code == 200
+
+
+def test_update_invalidates_cached_book(client, admin_headers, book):
+    book_id = book.pop("id")
+    etag = client.get(f"/books/{book_id}").headers["ETag"]
+
+    client.put(
+        f"/books/{book_id}",
+        json={**book, "available_copies": 0},
+        headers=admin_headers,
+    )
+    response = client.get(f"/books/{book_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["available_copies"] == 0
+    assert response.headers["ETag"] != etag
+
+
+def test_delete_invalidates_cached_book(client, admin_headers, book):
+    book_id = book["id"]
+    client.get(f"/books/{book_id}")
+    client.delete(f"/books/{book_id}", headers=admin_headers)
+    assert client.get(f"/books/{book_id}").status_code == 404
+
+
+def test_cache_backend_requires_all_operations():
+    class IncompleteBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+        async def set(self, key, value):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
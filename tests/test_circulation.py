@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("circulationadmin")
+
+
+@pytest.fixture(scope="module")
+def user_id(client, admin_headers):
+    return client.get("/users/me/", headers=admin_headers).json()["id"]
+
+
+@pytest.fixture
+def book_id(admin_headers, make_book):
+    return make_book(admin_headers, title="Single Copy")["id"]
+
+
+def checkout(client, headers, user_id, book_id):
+    issue_data = {
+        "user_id": user_id,
+        "book_id": book_id,
+        "issue_date": "2021-01-01",
+        "expected_return_date": "2021-02-01",
+    }
+    return client.post("/book_issues/", json=issue_data, headers=headers)
+
+
+def available_copies(client, book_id):
+    return client.get(f"/books/{book_id}").json()["available_copies"]
+
+
+def test_checkout_decrements_and_rejects_when_exhausted(
+    client, admin_headers, user_id, book_id
+):
+    assert available_copies(client, book_id) == 1
+    assert checkout(client, admin_headers, user_id, book_id).status_code == 200
+    assert available_copies(client, book_id) == 0
+
+    response = checkout(client, admin_headers, user_id, book_id)
+    assert response.status_code == 409
+    assert available_copies(client, book_id) == 0
+
+
+def test_concurrent_checkouts_of_last_copy(
+    client, admin_headers, user_id, book_id
+):
+    # Каждый запрос — в своём потоке, как у отдельных клиентов
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        responses = list(
+            pool.map(
+                lambda _: checkout(client, admin_headers, user_id, book_id),
+                range(10),
+            )
+        )
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200] + [409] * 9
+    assert available_copies(client, book_id) == 0
+
+
+def test_return_increments_once(client, admin_headers, user_id, book_id):
+    issue_id = checkout(client, admin_headers, user_id, book_id).json()["id"]
+
+    for return_date in ("2021-01-15", "2021-01-20"):
+        response = client.put(
+            f"/book_issues/{issue_id}",
+            json={"return_date": return_date},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["return_date"] == return_date
+        assert available_copies(client, book_id) == 1
+
+
+def test_checkout_of_missing_book(client, admin_headers, user_id):
+    assert checkout(client, admin_headers, user_id, 10**9).status_code == 404
+
+
+def test_return_of_missing_issue(client, admin_headers):
+    response = client.put(
+        f"/book_issues/{10**9}",
+        json={"return_date": "2021-01-15"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 404
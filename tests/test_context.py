@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import context
+from tests.conftest import TestingSessionLocal
+
+# Отдельное приложение, которое возвращает собственный контекст запроса
+context_app = FastAPI()
+context_app.add_middleware(context.RequestContextMiddleware)
+
+
+@context_app.get("/items/{item_id}")
+async def read_item(item_id: int):
+    async with TestingSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 2"))
+    request = context.current()
+    return {
+        "route": request.route,
+        "statements": request.statements,
+        "db_seconds": request.db_seconds,
+    }
+
+
+context_client = TestClient(context_app)
+
+
+def test_request_context_has_route_template_and_sql_stats():
+    response = context_client.get("/items/42")
+    assert response.json()["route"] == "GET /items/{item_id}"
+    assert response.json()["statements"] == 2
+    assert response.json()["db_seconds"] > 0
+
+
+def test_unmatched_path_is_not_exposed():
+    request = context.RequestContext(
+        {"method": "GET", "path": "/no-such-path/1"}
+    )
+    assert request.route == "GET <unmatched>"
+    assert context.current() is None
+
+
+def test_statement_listeners_get_request_context():
+    seen = []
+    listener = context.on_statement(
+        lambda request, statement, *args: seen.append((request, statement))
+    )
+    try:
+        context_client.get("/items/1")
+    finally:
+        context._statement_listeners.remove(listener)
+    statements = [statement for _, statement in seen]
+    assert statements == ["SELECT 1", "SELECT 2"]
+    assert all(request is not None for request, _ in seen)
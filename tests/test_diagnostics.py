@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app import config, context, diagnostics, models
+from tests.conftest import TestingSessionLocal
+
+# Отдельное приложение с маршрутом, который грузит книги по одной
+loop_app = FastAPI()
+loop_app.add_middleware(context.RequestContextMiddleware)
+
+
+@loop_app.get("/books-one-by-one")
+async def books_one_by_one(count: int):
+    async with TestingSessionLocal() as db:
+        for book_id in range(count):
+            await db.scalar(
+                select(models.Book).filter(models.Book.id == -book_id)
+            )
+    return {"loaded": count}
+
+
+loop_client = TestClient(loop_app)
+
+
+def test_repeated_select_raises_in_test_mode():
+    threshold = config.N_PLUS_ONE_THRESHOLD
+    response = loop_client.get(f"/books-one-by-one?count={threshold}")
+    assert response.status_code == 200
+
+    with pytest.raises(diagnostics.NPlusOneError) as error:
+        loop_client.get(f"/books-one-by-one?count={threshold + 1}")
+    assert "GET /books-one-by-one" in str(error.value)
+
+
+def test_repeated_select_is_logged_without_raise(monkeypatch, caplog):
+    monkeypatch.setattr(config, "N_PLUS_ONE_RAISE", False)
+    monkeypatch.setattr(config, "N_PLUS_ONE_THRESHOLD", 2)
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics"):
+        response = loop_client.get("/books-one-by-one?count=5")
+    assert response.status_code == 200
+    warnings = [r for r in caplog.records if "N+1" in r.getMessage()]
+    # Предупреждение одно на форму запроса, а не на каждое повторение
+    assert len(warnings) == 1
+
+
+def test_slow_query_log_has_route_and_parameter_types(
+    client, monkeypatch, caplog
+):
+    monkeypatch.setattr(config, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics"):
+        client.get("/books/424242")
+    messages = [
+        r.getMessage()
+        for r in caplog.records
+        if "Slow query" in r.getMessage()
+    ]
+    assert messages
+    assert "GET /books/{book_id}" in messages[0]
+    assert "(int" in messages[0]
+    assert "424242" not in messages[0]
+
+
+def test_statement_shape_collapses_in_lists():
+    first = diagnostics.statement_shape(
+        "SELECT * FROM books WHERE id IN (?, ?, ?)"
+    )
+    second = diagnostics.statement_shape(
+        "SELECT *\n FROM books WHERE id IN ($1, $2)"
+    )
+    assert first == second == "SELECT * FROM books WHERE id IN (...)"
+
+
+def test_parameter_shape():
+    assert diagnostics.parameter_shape((1, "a")) == "(int, str)"
+    assert diagnostics.parameter_shape({"id": 1}) == "{id: int}"
+    assert (
+        diagnostics.parameter_shape([(1,), (2,)], executemany=True)
+        == "2 x (int)"
+    )
@@ -0,0 +1,282 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app import config, events
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("eventsadmin")
+
+
+BOOK = {
+    "title": "Streamed Book",
+    "description": "Description",
+    "publication_date": "2000-01-01",
+    "available_copies": 2,
+}
+
+
+@pytest.fixture(scope="module")
+def book(admin_headers, make_book):
+    return make_book(admin_headers, **BOOK)
+
+
+def test_subscription_keeps_latest_value_per_book():
+    async def scenario():
+        broker = events.Broker(max_subscribers=1)
+        subscription = broker.subscribe([1, 2])
+        with pytest.raises(HTTPException) as error:
+            broker.subscribe([3])
+        assert error.value.status_code == 503
+
+        # Медленный подписчик получает только последние значения
+        for book_id, copies in ((1, 3), (1, 2), (2, 5), (3, 9)):
+            broker.deliver(book_id, copies)
+        assert await subscription.get() == {1: 2, 2: 5}
+
+        broker.unsubscribe(subscription)
+        broker.deliver(1, 0)
+        assert broker.subscriber_count() == 0
+        assert subscription._pending == {}
+
+    asyncio.run(scenario())
+
+
+async def _open_stream(path, query):
+    """Запускает приложение напрямую, чтобы читать бесконечный ответ."""
+    chunks = asyncio.Queue()
+    disconnected = asyncio.Event()
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            await chunks.put(message["status"])
+        elif message.get("body"):
+            await chunks.put(message["body"])
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    task = asyncio.create_task(app(scope, receive, send))
+    return chunks, disconnected, task
+
+
+def _events(chunk):
+    return [
+        json.loads(line[len("data: ") :])
+        for line in chunk.decode().splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+def test_stream_pushes_snapshot_and_changes(client, admin_headers, book):
+    book_id = book["id"]
+    user_id = client.get("/users/me/", headers=admin_headers).json()["id"]
+
+    async def scenario():
+        chunks, disconnected, task = await _open_stream(
+            "/books/availability", f"ids={book_id}"
+        )
+        assert await asyncio.wait_for(chunks.get(), 5) == 200
+        snapshot = await asyncio.wait_for(chunks.get(), 5)
+        assert _events(snapshot) == [
+            {"book_id": book_id, "available_copies": 2}
+        ]
+
+        # Запись выполняется в другом потоке и цикле событий, как у
+        # отдельного запроса
+        issue_data = {
+            "user_id": user_id,
+            "book_id": book_id,
+            "issue_date": "2021-01-01",
+            "expected_return_date": "2021-02-01",
+        }
+        response = await asyncio.to_thread(
+            client.post,
+            "/book_issues/",
+            json=issue_data,
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        change = await asyncio.wait_for(chunks.get(), 5)
+        assert _events(change) == [{"book_id": book_id, "available_copies": 1}]
+        issue_id = response.json()["id"]
+
+        # Правка без изменения available_copies событий не рассылает
+        book_data = dict(
+            BOOK, author_id=book["author_id"], available_copies=1
+        )
+        await asyncio.to_thread(
+            client.put,
+            f"/books/{book_id}",
+            json=dict(book_data, title="Renamed Streamed Book"),
+            headers=admin_headers,
+        )
+
+        book_data = dict(BOOK, author_id=book["author_id"], available_copies=7)
+        await asyncio.to_thread(
+            client.put,
+            f"/books/{book_id}",
+            json=book_data,
+            headers=admin_headers,
+        )
+        change = await asyncio.wait_for(chunks.get(), 5)
+        assert _events(change) == [{"book_id": book_id, "available_copies": 7}]
+
+        await asyncio.to_thread(
+            client.put,
+            f"/book_issues/{issue_id}",
+            json={"return_date": "2021-01-15"},
+            headers=admin_headers,
+        )
+        change = await asyncio.wait_for(chunks.get(), 5)
+        assert _events(change) == [{"book_id": book_id, "available_copies": 8}]
+
+        disconnected.set()
+        await asyncio.wait_for(task, 5)
+        assert events.broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_validates_ids(client):
+    assert client.get("/books/availability").status_code == 422
+    response = client.get("/books/availability", params={"ids": "x"})
+    assert response.status_code == 400
+
+
+def test_stream_ends_when_broker_closes_it(book):
+    async def scenario():
+        chunks, disconnected, task = await _open_stream(
+            "/books/availability", f"ids={book['id']}"
+        )
+        assert await asyncio.wait_for(chunks.get(), 5) == 200
+        await asyncio.wait_for(chunks.get(), 5)
+
+        events.broker.close_all()
+        await asyncio.wait_for(task, 5)
+        assert events.broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_local_backend_delivers_after_commit():
+    async def scenario():
+        backend = events.LocalEventBackend()
+        db = SimpleNamespace(info={})
+        subscription = events.broker.subscribe([1])
+        try:
+            await backend.publish(db, 1, 4)
+            await backend.publish(db, 1, 3)
+            assert subscription._pending == {}
+            backend.after_commit(db)
+            assert await subscription.get() == {1: 3}
+            assert db.info == {}
+        finally:
+            events.broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_event_backend_requires_publish():
+    class SilentBackend(events.EventBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        SilentBackend()
+
+
+class FakeListenConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    def terminate(self):
+        for callback in self.termination_listeners:
+            callback(self)
+
+    async def close(self):
+        # asyncpg вызывает слушателей и при обычном закрытии
+        self.closed = True
+        self.terminate()
+
+
+def test_postgres_listener_reconnects_and_closes_streams(monkeypatch):
+    import asyncpg
+
+    connections = []
+    failures = []
+
+    async def connect(dsn):
+        if failures:
+            raise failures.pop()
+        connection = FakeListenConnection()
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(config, "DB_WAIT_INITIAL_DELAY", 0.01)
+
+    async def scenario():
+        backend = events.PostgresEventBackend(
+            "postgresql+asyncpg://user:password@db/library"
+        )
+        await backend.start()
+        before = events.broker.subscribe([1])
+
+        failures.append(OSError("Connection refused"))
+        connections[0].terminate()
+        # Изменения за время разрыва потеряны: поток закрывается сразу
+        assert await asyncio.wait_for(before.get(), 1) is None
+        during = events.broker.subscribe([1])
+        # и ещё раз после восстановления, для открытых во время разрыва
+        assert await asyncio.wait_for(during.get(), 5) is None
+        assert len(connections) == 2
+
+        after = events.broker.subscribe([1])
+        notify = connections[1].listeners[events.CHANNEL]
+        notify(
+            connections[1],
+            1,
+            events.CHANNEL,
+            '{"book_id": 1, "available_copies": 3}',
+        )
+        assert await asyncio.wait_for(after.get(), 1) == {1: 3}
+        events.broker.unsubscribe(after)
+
+        await backend.stop()
+        assert connections[1].closed
+        assert len(connections) == 2
+
+    asyncio.run(scenario())
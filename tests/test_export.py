@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app import config
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("exportadmin")
+
+
+@pytest.fixture(scope="module")
+def author_ids(admin_headers, make_author):
+    return [
+        make_author(
+            admin_headers,
+            name=f"Exported Author {number}",
+            biography="Biography, with comma",
+        )["id"]
+        for number in range(5)
+    ]
+
+
+def test_export_authors_ndjson_streams_all_rows(
+    client, admin_headers, author_ids, monkeypatch
+):
+    monkeypatch.setattr(config, "EXPORT_BATCH_SIZE", 2)
+    response = client.get("/authors/export", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = {row["id"]: row for row in rows}
+    assert [row["id"] for row in rows] == sorted(exported)
+    assert set(author_ids) <= set(exported)
+    assert exported[author_ids[0]] == {
+        "id": author_ids[0],
+        "name": "Exported Author 0",
+        "biography": "Biography, with comma",
+        "birth_date": "1950-01-01",
+    }
+
+
+def test_export_authors_csv(client, admin_headers, author_ids):
+    response = client.get(
+        "/authors/export", params={"format": "csv"}, headers=admin_headers
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="authors.csv"' in response.headers[
+        "content-disposition"
+    ]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    exported = {int(row["id"]): row for row in rows}
+    assert exported[author_ids[1]]["biography"] == "Biography, with comma"
+
+
+def test_export_book_issues(client, admin_headers):
+    response = client.get("/book_issues/export", headers=admin_headers)
+    assert response.status_code == 200
+
+
+def test_export_requires_admin(client):
+    assert client.get("/books/export").status_code == 401
@@ -0,0 +1,86 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("genreadmin")
+
+
+@pytest.fixture(scope="module")
+def author_id(admin_headers, make_author):
+    return make_author(admin_headers, name="Genre Author")["id"]
+
+
+def create_genre(client, headers, name):
+    response = client.post("/genres/", json={"name": name}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def facets(client, **params):
+    response = client.get("/genres/facets", params=params)
+    assert response.status_code == 200
+    return {facet["id"]: facet["book_count"] for facet in response.json()}
+
+
+def test_genre_crud(client, admin_headers):
+    genre_id = create_genre(client, admin_headers, "Poetri")
+    response = client.put(
+        f"/genres/{genre_id}", json={"name": "Poetry"}, headers=admin_headers
+    )
+    assert response.json() == {"id": genre_id, "name": "Poetry"}
+    assert client.get(f"/genres/{genre_id}").json()["name"] == "Poetry"
+    assert genre_id in [genre["id"] for genre in client.get("/genres/").json()]
+
+    client.delete(f"/genres/{genre_id}", headers=admin_headers)
+    assert client.get(f"/genres/{genre_id}").status_code == 404
+    assert genre_id not in facets(client)
+
+
+def test_genre_filter_and_counters(
+    client, admin_headers, author_id, make_book
+):
+    horror = create_genre(client, admin_headers, "Horror")
+    mystery = create_genre(client, admin_headers, "Mystery")
+    first, second, third = (
+        make_book(admin_headers, author_id=author_id, title=title)["id"]
+        for title in ("Haunted Lighthouse", "Silent Lighthouse", "Locked Room")
+    )
+    for book_id in (first, second):
+        client.put(f"/books/{book_id}/genres/{horror}", headers=admin_headers)
+    for book_id in (second, third):
+        client.put(f"/books/{book_id}/genres/{mystery}", headers=admin_headers)
+    # Повторное добавление не меняет счётчик
+    client.put(f"/books/{first}/genres/{horror}", headers=admin_headers)
+
+    response = client.get("/books/", params={"genre": horror})
+    assert [book["id"] for book in response.json()] == [first, second]
+
+    counts = facets(client)
+    assert counts[horror] == 2
+    assert counts[mystery] == 2
+
+    counts = facets(client, search="lighthouse")
+    assert counts == {horror: 2, mystery: 1}
+
+    client.delete(f"/books/{second}/genres/{mystery}", headers=admin_headers)
+    client.delete(f"/books/{first}", headers=admin_headers)
+    counts = facets(client)
+    assert counts[horror] == 1
+    assert counts[mystery] == 1
+    response = client.get("/books/", params={"genre": horror})
+    assert [book["id"] for book in response.json()] == [second]
+
+
+def test_add_genre_to_missing_book(client, admin_headers):
+    genre_id = create_genre(client, admin_headers, "Orphans")
+    response = client.put(
+        f"/books/{10**9}/genres/{genre_id}", headers=admin_headers
+    )
+    assert response.status_code == 404
+    assert facets(client)[genre_id] == 0
+
+
+def test_remove_missing_book_genre(client, admin_headers):
+    response = client.delete(f"/books/1/genres/{10**9}", headers=admin_headers)
+    assert response.status_code == 404
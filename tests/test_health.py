@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app import config, database
+from app.main import app
+
+
+@pytest.fixture
+def unstarted_client():
+    # Модуль проверяет сам запуск, поэтому общий client из conftest
+    # (с уже выполненным lifespan) здесь не подходит
+    return TestClient(app)
+
+
+def test_healthz_does_not_need_database(unstarted_client):
+    response = unstarted_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+def test_readyz_is_unavailable_before_startup(unstarted_client):
+    assert unstarted_client.get("/readyz").status_code == 503
+
+
+def test_startup_is_fast_and_becomes_ready(unstarted_client):
+    start = time.perf_counter()
+    with TestClient(app) as started:
+        assert time.perf_counter() - start < 1
+        response = started.get("/readyz")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+    assert unstarted_client.get("/readyz").status_code == 503
+
+
+def test_readyz_reports_unreachable_database(unstarted_client, monkeypatch):
+    async def refuse():
+        raise ConnectionRefusedError("connection refused")
+
+    app.state.ready = True
+    monkeypatch.setattr(database, "_ping", refuse)
+    try:
+        assert unstarted_client.get("/readyz").status_code == 503
+    finally:
+        app.state.ready = False
+
+
+def test_wait_for_database_backs_off(monkeypatch):
+    attempts = []
+    delays = []
+
+    async def flaky_ping():
+        attempts.append(time.monotonic())
+        if len(attempts) < 4:
+            raise OperationalError("SELECT 1", {}, ConnectionError("down"))
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(database, "_ping", flaky_ping)
+    monkeypatch.setattr(database.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(config, "DB_WAIT_INITIAL_DELAY", 0.1)
+    monkeypatch.setattr(config, "DB_WAIT_MAX_DELAY", 0.3)
+
+    assert asyncio.run(database.wait_for_database()) == 4
+    assert delays == [0.1, 0.2, 0.3]
+
+
+def test_wait_for_database_gives_up(monkeypatch):
+    async def refuse():
+        raise ConnectionRefusedError("connection refused")
+
+    monkeypatch.setattr(database, "_ping", refuse)
+    monkeypatch.setattr(config, "DB_WAIT_TIMEOUT", 0.05)
+    monkeypatch.setattr(config, "DB_WAIT_INITIAL_DELAY", 0.01)
+
+    with pytest.raises(ConnectionRefusedError):
+        asyncio.run(database.wait_for_database())
+
+
+def test_create_all_is_skipped_under_alembic(tmp_path, monkeypatch):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/schema.db", poolclass=NullPool
+    )
+    monkeypatch.setattr(database, "async_engine", engine)
+
+    async def tables():
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table'")
+            )
+            return {row[0] for row in result}
+
+    async def scenario():
+        async with engine.begin() as connection:
+            await connection.execute(
+                text("CREATE TABLE alembic_version (version_num TEXT)")
+            )
+        assert await database.init_schema() is False
+        assert "books" not in await tables()
+
+        monkeypatch.setattr(config, "DB_CREATE_ALL", "always")
+        assert await database.init_schema() is True
+        assert "books" in await tables()
+        await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,101 @@
+import pytest
+from sqlalchemy import insert
+
+from app import models
+from tests.conftest import engine
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("includeadmin")
+
+
+@pytest.fixture(scope="module")
+def catalog(admin_headers, make_author, make_book):
+    with engine.begin() as connection:
+        genre_ids = [
+            connection.execute(
+                insert(models.Genre).values(name=name)
+            ).inserted_primary_key[0]
+            for name in ("Fantasy", "Science Fiction")
+        ]
+    book_ids = []
+    for number in range(5):
+        author = make_author(admin_headers, name=f"Included Author {number}")
+        book = make_book(
+            admin_headers,
+            author_id=author["id"],
+            title=f"Included Book {number}",
+        )
+        book_ids.append(book["id"])
+    with engine.begin() as connection:
+        connection.execute(
+            insert(models.book_genres),
+            [
+                {"book_id": book_id, "genre_id": genre_id}
+                for book_id in book_ids
+                for genre_id in genre_ids
+            ],
+        )
+    return book_ids
+
+
+def test_list_without_include_has_no_relations(client, catalog):
+    response = client.get("/books/", params={"limit": 1000})
+    book = next(b for b in response.json() if b["id"] == catalog[0])
+    assert "author" not in book
+    assert "genres" not in book
+
+
+def test_list_include_uses_fixed_number_of_queries(
+    client, catalog, statements
+):
+    response = client.get(
+        "/books/",
+        params={"limit": 1000, "include": "author,genres"},
+    )
+    assert response.status_code == 200
+    books = {book["id"]: book for book in response.json()}
+    assert len(books) >= len(catalog)
+
+    # Книги, авторы и жанры — по одному запросу независимо от числа книг
+    assert len(statements.selects()) == 3
+
+    book = books[catalog[0]]
+    assert book["author"]["id"] == book["author_id"]
+    assert book["author"]["name"] == "Included Author 0"
+    assert sorted(genre["name"] for genre in book["genres"]) == [
+        "Fantasy",
+        "Science Fiction",
+    ]
+
+
+def test_detail_include_author(client, catalog, statements):
+    response = client.get(
+        f"/books/{catalog[1]}", params={"include": "author"}
+    )
+    assert response.status_code == 200
+    assert response.json()["author"]["name"] == "Included Author 1"
+    assert "genres" not in response.json()
+    assert len(statements.selects()) == 2
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        f"/books/{catalog[1]}",
+        params={"include": "author"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 304
+
+
+def test_include_ignores_empty_names(client, catalog):
+    response = client.get(
+        f"/books/{catalog[2]}", params={"include": "author,"}
+    )
+    assert response.status_code == 200
+    assert response.json()["author"]["name"] == "Included Author 2"
+
+
+def test_unknown_include_is_rejected(client):
+    response = client.get("/books/", params={"include": "author,reviews"})
+    assert response.status_code == 400
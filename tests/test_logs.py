@@ -0,0 +1,110 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from app import context, logs
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("logsadmin")
+
+
+@pytest.fixture
+def request_records():
+    def attach(rates):
+        handler = ListHandler()
+        handler.addFilter(logs.RequestLogFilter(rates))
+        logging.getLogger("app").addHandler(handler)
+        attached.append(handler)
+        return handler.records
+
+    attached = []
+    yield attach
+    for handler in attached:
+        logging.getLogger("app").removeHandler(handler)
+
+
+def test_request_records_carry_route_and_are_logged_once(
+    admin_headers, make_author, request_records
+):
+    records = request_records({})
+    make_author(admin_headers, name="Logged Author")
+    created = [r for r in records if r.getMessage().startswith("Author ")]
+    assert len(created) == 1
+    assert created[0].route == "POST /authors/"
+
+
+def test_success_records_are_sampled_per_route(
+    admin_headers, make_author, request_records
+):
+    records = request_records({"POST /authors/": 0})
+    make_author(admin_headers, name="Logged Author")
+    assert not [r for r in records if r.getMessage().startswith("Author ")]
+
+
+def test_warnings_and_records_outside_requests_are_not_sampled():
+    log_filter = logs.RequestLogFilter({}, default_rate=0)
+    record = logging.makeLogRecord({"levelno": logging.INFO})
+    assert log_filter.filter(record)
+    assert record.route is None
+
+    token = context._current.set(
+        context.RequestContext({"method": "GET", "route": None})
+    )
+    try:
+        assert not log_filter.filter(
+            logging.makeLogRecord({"levelno": logging.INFO})
+        )
+        assert log_filter.filter(
+            logging.makeLogRecord({"levelno": logging.WARNING})
+        )
+    finally:
+        context._current.reset(token)
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord(
+        {
+            "name": "app.crud",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "User %s created",
+            "args": ("alice",),
+            "is_admin": True,
+            "route": "POST /users/",
+        }
+    )
+    entry = json.loads(logs.JSONFormatter().format(record))
+    assert entry["message"] == "User alice created"
+    assert entry["logger"] == "app.crud"
+    assert entry["route"] == "POST /users/"
+    assert entry["is_admin"] is True
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    formatted = []
+
+    class Argument:
+        def __str__(self):
+            formatted.append(True)
+            return "argument"
+
+    handler = logs.NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(logging.makeLogRecord({"msg": "%s", "args": (Argument(),)}))
+    handler.handle(logging.makeLogRecord({"msg": "second"}))
+
+    assert formatted == []
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().getMessage() == "argument"
@@ -0,0 +1,148 @@
+import re
+
+
+def sample(text, name, **labels):
+    """Значение строки метрики с заданными метками (или None)."""
+    for line in text.splitlines():
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(
+            re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or "")
+        )
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    return None
+
+
+def test_metrics_format(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "# TYPE http_requests_in_progress gauge" in response.text
+    assert sample(response.text, "threadpool_tasks", state="limit") > 0
+    assert sample(response.text, "password_hasher_tasks", state="queued") == 0
+
+
+def test_requests_are_counted_by_route_template(client):
+    before = client.get("/metrics").text
+    route = "/books/{book_id}"
+    count = (
+        sample(
+            before,
+            "http_requests_total",
+            method="GET",
+            route=route,
+            status="404",
+        )
+        or 0
+    )
+
+    for book_id in (999991, 999992):
+        assert client.get(f"/books/{book_id}").status_code == 404
+
+    after = client.get("/metrics").text
+    assert (
+        sample(
+            after,
+            "http_requests_total",
+            method="GET",
+            route=route,
+            status="404",
+        )
+        == count + 2
+    )
+    assert (
+        sample(
+            after,
+            "http_request_duration_seconds_count",
+            method="GET",
+            route=route,
+        )
+        >= 2
+    )
+    assert (
+        sample(
+            after,
+            "http_request_duration_seconds_bucket",
+            method="GET",
+            route=route,
+            le="+Inf",
+        )
+        >= 2
+    )
+    # Путь не становится меткой
+    assert "/books/999991" not in after
+
+
+def test_sql_statements_are_attributed_to_request(client):
+    client.get("/books/", params={"limit": 5})
+    text = client.get("/metrics").text
+    statements = sample(
+        text, "http_request_db_statements_sum", method="GET", route="/books/"
+    )
+    assert statements >= 1
+    assert (
+        sample(
+            text,
+            "http_request_db_duration_seconds_sum",
+            method="GET",
+            route="/books/",
+        )
+        > 0
+    )
+    # Запрос без обращений к базе
+    assert (
+        sample(
+            text,
+            "http_request_db_statements_bucket",
+            method="GET",
+            route="/metrics",
+            le="0.0",
+        )
+        >= 1
+    )
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/no-such-path/12345")
+    text = client.get("/metrics").text
+    assert (
+        sample(
+            text,
+            "http_requests_total",
+            method="GET",
+            route="<unmatched>",
+            status="404",
+        )
+        >= 1
+    )
+
+
+def test_monotonic_values_are_counters(client):
+    before = client.get("/metrics").text
+    assert "# TYPE db_pool_checkout_timeouts_total counter" in before
+    assert "# TYPE log_records_dropped_total counter" in before
+    assert sample(before, "db_pool_checkout_timeouts_total") == 0
+    rejected = sample(
+        before, "password_hasher_results_total", result="rejected"
+    )
+    completed = sample(
+        before, "password_hasher_results_total", result="completed"
+    )
+
+    client.post(
+        "/users/", json={"username": "metricsuser", "password": "secret"}
+    )
+    after = client.get("/metrics").text
+    assert (
+        sample(after, "password_hasher_results_total", result="completed")
+        == completed + 1
+    )
+    assert (
+        sample(after, "password_hasher_results_total", result="rejected")
+        == rejected
+    )
+    # Состояния пула хеширования остаются мгновенными значениями
+    assert sample(after, "password_hasher_tasks", state="completed") is None
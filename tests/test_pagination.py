@@ -0,0 +1,72 @@
+import pytest
+
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("pageadmin")
+
+
+@pytest.fixture(scope="module")
+def author_ids(admin_headers, make_author):
+    return [
+        make_author(admin_headers, name=f"Paged Author {number}")["id"]
+        for number in range(7)
+    ]
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+
+def test_cursor_pages_cover_listing_in_order(client, author_ids):
+    seen = []
+    params = {"limit": 3}
+    while True:
+        response = client.get("/authors/", params=params)
+        assert response.status_code == 200
+        seen.extend(author["id"] for author in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+        params = {"limit": 3, "cursor": cursor}
+
+    assert seen == sorted(set(seen))
+    assert set(author_ids) <= set(seen)
+
+
+def test_skip_limit_still_supported(client, author_ids):
+    everything = client.get("/authors/", params={"limit": 1000}).json()
+    response = client.get("/authors/", params={"skip": 2, "limit": 2})
+    assert response.json() == everything[2:4]
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/authors/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_book_issues_are_paginated(client, admin_headers, make_book):
+    book_id = make_book(admin_headers, available_copies=10)["id"]
+    user_id = client.get("/users/me/", headers=admin_headers).json()["id"]
+    for _ in range(3):
+        issue_data = {
+            "user_id": user_id,
+            "book_id": book_id,
+            "issue_date": "2021-01-01",
+            "expected_return_date": "2021-02-01",
+        }
+        client.post("/book_issues/", json=issue_data, headers=admin_headers)
+
+    first = client.get(
+        "/book_issues/", params={"limit": 2}, headers=admin_headers
+    )
+    assert len(first.json()) == 2
+    second = client.get(
+        "/book_issues/",
+        params={"limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]},
+        headers=admin_headers,
+    )
+    assert len(second.json()) == 1
+    assert NEXT_CURSOR_HEADER not in second.headers
@@ -0,0 +1,78 @@
+"""Горячие запросы должны обслуживаться индексами, а не полным сканированием.
+
+Тест перехватывает SQL, который реально выполняют эндпоинты, и
+прогоняет его через EXPLAIN QUERY PLAN тестовой SQLite.
+"""
+
+import pytest
+from sqlalchemy import select
+
+from app import models
+from tests.conftest import engine
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("planadmin")
+
+
+def full_scans(statement, parameters=()):
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+        ).all()
+    # "SCAN t" — чтение всей таблицы; "SEARCH t USING ..." — по индексу
+    return [row.detail for row in plan if row.detail.startswith("SCAN ")]
+
+
+def compiled(query):
+    compiled_query = query.compile(engine)
+    return str(compiled_query), [
+        compiled_query.params[name] for name in compiled_query.positiontup
+    ]
+
+
+def test_book_issues_listing_uses_index(client, admin_headers, statements):
+    client.get(
+        "/book_issues/", params={"limit": 5}, headers=admin_headers
+    )
+    issue_queries = [s for s in statements if "FROM book_issues" in s[0]]
+    assert issue_queries
+    for statement, parameters in issue_queries:
+        assert full_scans(statement, parameters) == []
+
+
+def test_book_cursor_page_uses_primary_key(client, statements):
+    client.get("/books/", params={"limit": 5, "cursor": "eyJpZCI6MX0"})
+    book_queries = [s for s in statements if "FROM books" in s[0]]
+    assert book_queries
+    for statement, parameters in book_queries:
+        assert full_scans(statement, parameters) == []
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        select(models.Book).where(models.Book.author_id == 1),
+        select(models.BookIssue).where(models.BookIssue.book_id == 1),
+        select(models.Book)
+        .join(models.book_genres)
+        .where(models.book_genres.c.genre_id == 1),
+        select(models.Genre)
+        .join(models.book_genres)
+        .where(models.book_genres.c.book_id == 1),
+    ],
+    ids=[
+        "books_by_author",
+        "issues_by_book",
+        "books_by_genre",
+        "genres_by_book",
+    ],
+)
+def test_foreign_key_lookups_use_index(query):
+    assert full_scans(*compiled(query)) == []
+
+
+def test_detector_flags_sequential_scan():
+    query = select(models.Book).where(models.Book.description == "x")
+    assert full_scans(*compiled(query)) == ["SCAN books"]
@@ -0,0 +1,59 @@
+import pytest
+
+from app import schemas
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("responsesadmin")
+
+
+@pytest.fixture(scope="module")
+def book(admin_headers, make_author, make_book):
+    author = make_author(
+        admin_headers, name="Responses Author", birth_date="1950-01-02"
+    )
+    return make_book(
+        admin_headers,
+        author_id=author["id"],
+        title="Responses Book",
+        publication_date="2001-02-03",
+        available_copies=2,
+    )
+
+
+def test_list_rows_match_response_schemas(client, admin_headers, book):
+    cases = [
+        ("/books/", schemas.BookResponse, {"limit": 1000}),
+        ("/authors/", schemas.AuthorResponse, {"limit": 1000}),
+    ]
+    for url, schema, params in cases:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        for item in response.json():
+            assert list(item) == list(schema.model_fields)
+
+    listed = client.get("/books/", params={"limit": 1000}).json()
+    assert book in listed
+
+
+def test_book_issue_rows_serialize_dates(client, admin_headers, book):
+    user_id = client.get("/users/me/", headers=admin_headers).json()["id"]
+    issue_data = {
+        "user_id": user_id,
+        "book_id": book["id"],
+        "issue_date": "2021-03-04",
+        "expected_return_date": "2021-03-18",
+    }
+    created = client.post(
+        "/book_issues/", json=issue_data, headers=admin_headers
+    ).json()
+
+    response = client.get("/book_issues/", headers=admin_headers)
+    assert response.status_code == 200
+    assert created in response.json()
+    issue = next(i for i in response.json() if i["id"] == created["id"])
+    assert list(issue) == list(schemas.BookIssueResponse.model_fields)
+    assert issue["return_date"] is None
+    assert issue["issue_date"] == "2021-03-04"
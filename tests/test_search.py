@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("searchadmin")
+
+
+@pytest.fixture(scope="module")
+def author_id(admin_headers, make_author):
+    return make_author(
+        admin_headers,
+        name="Ursula Le Guin",
+        biography="Wrote about Earthsea and anarchists",
+        birth_date="1929-10-21",
+    )["id"]
+
+
+@pytest.fixture
+def create_book(admin_headers, author_id, make_book):
+    def create(title, description):
+        return make_book(
+            admin_headers,
+            author_id=author_id,
+            title=title,
+            description=description,
+            publication_date="1968-01-01",
+        )["id"]
+
+    return create
+
+
+def test_search_books_ranks_title_matches_first(client, create_book):
+    in_description = create_book("Tales", "A wizard of the isles")
+    in_title = create_book("A Wizard of Earthsea", "Ged's story")
+    create_book("The Dispossessed", "Anarres")
+
+    response = client.get("/books/", params={"search": "wizard"})
+    assert response.status_code == 200
+    ids = [book["id"] for book in response.json()]
+    assert ids == [in_title, in_description]
+
+
+def test_search_books_matches_prefix(client, create_book):
+    book_id = create_book("Lathe of Heaven", "Dreams change reality")
+    response = client.get("/books/", params={"search": "dream"})
+    assert book_id in [book["id"] for book in response.json()]
+
+
+def test_search_index_follows_update_and_delete(
+    client, admin_headers, author_id, create_book
+):
+    book_id = create_book("Rocannon's World", "Hainish cycle")
+    book_data = {
+        "title": "Planet of Exile",
+        "description": "Hainish cycle",
+        "publication_date": "1966-01-01",
+        "available_copies": 1,
+        "author_id": author_id,
+    }
+    client.put(f"/books/{book_id}", json=book_data, headers=admin_headers)
+
+    response = client.get("/books/", params={"search": "Rocannon"})
+    assert response.json() == []
+    response = client.get("/books/", params={"search": "exile"})
+    assert [book["id"] for book in response.json()] == [book_id]
+
+    client.delete(f"/books/{book_id}", headers=admin_headers)
+    response = client.get("/books/", params={"search": "exile"})
+    assert response.json() == []
+
+
+def test_search_authors(client, author_id):
+    response = client.get("/authors/", params={"search": "earthsea"})
+    assert [author["id"] for author in response.json()] == [author_id]
+
+
+def test_search_ignores_fts_syntax(client):
+    response = client.get("/books/", params={"search": '"( OR *'})
+    assert response.status_code == 200
+    assert response.json() == []
@@ -0,0 +1,199 @@
+import pytest
+from sqlalchemy import text
+
+from tests.conftest import engine
+
+
+@pytest.fixture(scope="module")
+def admin_headers(make_admin_headers):
+    return make_admin_headers("statsadmin")
+
+
+@pytest.fixture(scope="module")
+def user_id(client, admin_headers):
+    return client.get("/users/me/", headers=admin_headers).json()["id"]
+
+
+@pytest.fixture(scope="module")
+def book_ids(admin_headers, make_author, make_book):
+    author_id = make_author(admin_headers, name="Stats Author")["id"]
+    return [
+        make_book(
+            admin_headers,
+            author_id=author_id,
+            title=title,
+            available_copies=10,
+        )["id"]
+        for title in ("Popular", "Less Popular")
+    ]
+
+
+def checkout(client, headers, user_id, book_id, issue_date, due_date):
+    issue_data = {
+        "user_id": user_id,
+        "book_id": book_id,
+        "issue_date": issue_date,
+        "expected_return_date": due_date,
+    }
+    response = client.post("/book_issues/", json=issue_data, headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def give_back(client, headers, issue_id, return_date):
+    response = client.put(
+        f"/book_issues/{issue_id}",
+        json={"return_date": return_date},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+
+def overdue(client, headers, as_of):
+    response = client.get(
+        "/admin/stats/overdue", params={"as_of": as_of}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()["overdue_loans"]
+
+
+def test_stats_require_admin(client):
+    assert client.get("/admin/stats/overdue").status_code == 401
+
+
+def test_user_loans_follow_checkout_and_return(
+    client, admin_headers, user_id, book_ids
+):
+    url = f"/admin/stats/users/{user_id}"
+    before = client.get(url, headers=admin_headers).json()
+
+    issue_id = checkout(
+        client, admin_headers, user_id, book_ids[0], "2031-03-03", "2031-03-17"
+    )
+    after_checkout = client.get(url, headers=admin_headers).json()
+    assert after_checkout["open_loans"] == before["open_loans"] + 1
+    assert after_checkout["total_loans"] == before["total_loans"] + 1
+
+    # Повторный возврат не должен уменьшать счётчик ещё раз
+    give_back(client, admin_headers, issue_id, "2031-03-10")
+    give_back(client, admin_headers, issue_id, "2031-03-11")
+    after_return = client.get(url, headers=admin_headers).json()
+    assert after_return["open_loans"] == before["open_loans"]
+    assert after_return["total_loans"] == before["total_loans"] + 1
+
+
+def test_unknown_user_has_empty_stats(client, admin_headers):
+    response = client.get("/admin/stats/users/999999", headers=admin_headers)
+    assert response.json() == {
+        "user_id": 999999,
+        "open_loans": 0,
+        "total_loans": 0,
+    }
+
+
+def test_overdue_counts_open_loans_past_due(
+    client, admin_headers, user_id, book_ids
+):
+    before = overdue(client, admin_headers, "2032-06-01")
+    kept = checkout(
+        client, admin_headers, user_id, book_ids[0], "2032-04-01", "2032-04-15"
+    )
+    returned = checkout(
+        client, admin_headers, user_id, book_ids[1], "2032-04-01", "2032-04-15"
+    )
+    checkout(
+        client, admin_headers, user_id, book_ids[1], "2032-05-01", "2032-07-01"
+    )
+    assert overdue(client, admin_headers, "2032-06-01") == before + 2
+
+    give_back(client, admin_headers, returned, "2032-05-20")
+    assert overdue(client, admin_headers, "2032-06-01") == before + 1
+    # На дату возврата срок ещё не истёк
+    assert overdue(client, admin_headers, "2032-04-15") == overdue(
+        client, admin_headers, "2032-04-14"
+    )
+    give_back(client, admin_headers, kept, "2032-05-21")
+    assert overdue(client, admin_headers, "2032-06-01") == before
+
+
+def test_returned_loans_leave_no_due_rows(
+    client, admin_headers, user_id, book_ids
+):
+    issue_ids = [
+        checkout(
+            client, admin_headers, user_id, book_id, "2034-02-01", "2034-02-15"
+        )
+        for book_id in book_ids
+    ]
+    give_back(client, admin_headers, issue_ids[0], "2034-02-10")
+    with engine.connect() as connection:
+        open_loans = connection.execute(
+            text(
+                "SELECT open_loans FROM loan_due_counts "
+                "WHERE due_date = '2034-02-15'"
+            )
+        ).scalar_one()
+    assert open_loans == 1
+
+    give_back(client, admin_headers, issue_ids[1], "2034-02-11")
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                "SELECT count(*) FROM loan_due_counts "
+                "WHERE due_date = '2034-02-15'"
+            )
+        ).scalar_one()
+    assert rows == 0
+
+
+def test_top_books_by_week(client, admin_headers, user_id, book_ids):
+    popular, less_popular = book_ids
+    # 2033-01-03 — понедельник, 2033-01-09 — воскресенье той же недели
+    for issue_date in ("2033-01-03", "2033-01-05", "2033-01-09"):
+        checkout(
+            client, admin_headers, user_id, popular, issue_date, "2033-02-01"
+        )
+    checkout(
+        client,
+        admin_headers,
+        user_id,
+        less_popular,
+        "2033-01-04",
+        "2033-02-01",
+    )
+    checkout(
+        client,
+        admin_headers,
+        user_id,
+        less_popular,
+        "2033-01-10",
+        "2033-02-01",
+    )
+
+    response = client.get(
+        "/admin/stats/top-books",
+        params={"week": "2033-01-06"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"book_id": popular, "week_start": "2033-01-03", "borrow_count": 3},
+        {
+            "book_id": less_popular,
+            "week_start": "2033-01-03",
+            "borrow_count": 1,
+        },
+    ]
+
+    response = client.get(
+        "/admin/stats/top-books",
+        params={"week": "2033-01-10", "limit": 1},
+        headers=admin_headers,
+    )
+    assert response.json() == [
+        {
+            "book_id": less_popular,
+            "week_start": "2033-01-10",
+            "borrow_count": 1,
+        }
+    ]
@@ -0,0 +1,123 @@
+from sqlalchemy import text
+
+from app.cache import principal_cache, revoked_refresh_families
+from app.hashing import password_hasher
+from tests.conftest import engine
+
+
+def create_user(client, username, password="testpassword"):
+    client.post("/users/", json={"username": username, "password": password})
+
+
+def login(client, username, password="testpassword"):
+    response = client.post(
+        "/token", data={"username": username, "password": password}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(client, refresh_token):
+    return client.post("/token/refresh", json={"refresh_token": refresh_token})
+
+
+def bearer(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+def test_refresh_rotates_tokens_without_hashing(
+    client, statements, monkeypatch
+):
+    create_user(client, "refresher")
+    tokens = login(client, "refresher")
+
+    async def forbidden(*args):
+        raise AssertionError("password hasher must not be used")
+
+    monkeypatch.setattr(password_hasher, "hash", forbidden)
+    monkeypatch.setattr(password_hasher, "verify_and_update", forbidden)
+
+    statements.clear()
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert statements.heads(1) == ["UPDATE"]
+
+    response = client.get("/users/me/", headers=bearer(refreshed))
+    assert response.json()["username"] == "refresher"
+
+
+def test_reused_refresh_token_revokes_family(client):
+    create_user(client, "reuser")
+    tokens = login(client, "reuser")
+    rotated = refresh(client, tokens["refresh_token"]).json()
+
+    # Старый токен предъявлен повторно — семейство отзывается целиком
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+    # Новый вход начинает новое семейство
+    new_tokens = login(client, "reuser")
+    assert refresh(client, new_tokens["refresh_token"]).status_code == 200
+
+
+def test_revoked_family_is_rejected_without_database(client, statements):
+    create_user(client, "revoker")
+    tokens = login(client, "revoker")
+    response = client.post(
+        "/token/revoke", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    assert len(revoked_refresh_families) > 0
+
+    statements.clear()
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    assert statements == []
+
+
+def test_password_change_revokes_refresh_tokens(client):
+    create_user(client, "changer")
+    tokens = login(client, "changer")
+    response = client.put(
+        "/users/me/", json={"password": "newpassword"}, headers=bearer(tokens)
+    )
+    assert response.status_code == 200
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_token_types_are_not_interchangeable(client):
+    create_user(client, "mixer")
+    tokens = login(client, "mixer")
+    assert refresh(client, tokens["access_token"]).status_code == 401
+    assert refresh(client, "not-a-token").status_code == 401
+    headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+    assert client.get("/users/me/", headers=headers).status_code == 401
+
+
+def deactivate(username):
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE users SET is_active = 0 WHERE username = :username"),
+            {"username": username},
+        )
+    # Отключение в базе; закэшированный пользователь устаревает по TTL
+    principal_cache.pop(username)
+
+
+def test_inactive_user_cannot_refresh(client):
+    create_user(client, "deactivated")
+    tokens = login(client, "deactivated")
+    deactivate("deactivated")
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    # Семейство удалено: повторная попытка тоже отклоняется
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_inactive_admin_is_rejected(client, make_admin_headers):
+    headers = make_admin_headers("deactivatedadmin")
+    assert client.get("/admin/db/pool", headers=headers).status_code == 200
+    deactivate("deactivatedadmin")
+    response = client.get("/admin/db/pool", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def admin_headers(client, make_admin_headers):
+    headers = make_admin_headers("writesadmin")
+    # Пользователь попадает в кэш, и аутентификация не читает базу
+    client.get("/users/me/", headers=headers)
+    return headers
+
+
+AUTHOR = {
+    "name": "Writes Author",
+    "biography": "Biography",
+    "birth_date": "1950-01-01",
+}
+
+
+def test_create_and_update_use_one_statement(
+    client, admin_headers, statements
+):
+    response = client.post("/authors/", json=AUTHOR, headers=admin_headers)
+    assert response.status_code == 200
+    assert statements.heads() == ["INSERT INTO"]
+    author_id = response.json()["id"]
+
+    statements.clear()
+    response = client.put(
+        f"/authors/{author_id}",
+        json=dict(AUTHOR, name="Writes Renamed"),
+        headers=admin_headers,
+    )
+    assert response.json() == dict(AUTHOR, id=author_id, name="Writes Renamed")
+    assert statements.heads() == ["UPDATE AUTHORS"]
+
+
+def test_update_missing_row_is_404_without_select(
+    client, admin_headers, statements
+):
+    book_data = {
+        "title": "Missing",
+        "description": "Description",
+        "publication_date": "2000-01-01",
+        "available_copies": 1,
+        "author_id": 1,
+    }
+    response = client.put(
+        "/books/999999", json=book_data, headers=admin_headers
+    )
+    assert response.status_code == 404
+    # Первая команда ограничена неизменным available_copies, вторая —
+    # нет; чтения строки нет ни в одной из них
+    assert statements.heads() == ["UPDATE BOOKS", "UPDATE BOOKS"]
+
+
+def test_delete_missing_author_is_404(client, admin_headers):
+    response = client.delete("/authors/999999", headers=admin_headers)
+    assert response.status_code == 404